@@ -1,5 +1,10 @@
 from typing import Any
 
+try:
+    from orjson import loads as json_loads  # noqa: F401
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads  # noqa: F401
+
 
 def percentage_to_ordered_list_item[_T](ordered_list: list[_T], percentage: int) -> _T:
     """Find the item that most closely matches the percentage in an ordered list.
@@ -15,15 +15,16 @@ __all__ = [
 import asyncio
 import contextlib
 import logging
-from contextlib import asynccontextmanager
+import random
 from types import TracebackType
-from typing import Any, Callable, Generator, Optional
+from typing import Any, Callable, Optional
 
 import aiohttp
 from aiohttp import web_exceptions
 
-from ..device import AferoResource
+from ..device import AferoDevice, AferoResource, get_afero_device
 from ..errors import DeviceNotFound, ExceededMaximumRetries, InvalidAuth
+from ..util import json_loads
 from . import models, v1_const
 from .auth import AferoAuth
 from .controllers.base import BaseResourcesController
@@ -54,11 +55,15 @@ class AferoBridgeV1:
         self._web_session: aiohttp.ClientSession = session
         self._account_id: Optional[str] = None
         self._afero_client: str = afero_client
+        self._client_cfg: dict[str, str] = v1_const.AFERO_CLIENTS[afero_client]
+        self._default_headers: dict[str, str] = {
+            "user-agent": self._client_cfg["DEFAULT_USERAGENT"],
+            "accept-encoding": "gzip",
+        }
         self._auth = AferoAuth(
             username, password, refresh_token=refresh_token, afero_client=afero_client
         )
         self.logger = logging.getLogger(f"{__package__}[{username}]")
-        self.logger.addHandler(logging.StreamHandler())
         self._known_devs: dict[str, BaseResourcesController] = {}
         # Data Updater
         self._events: EventStream = EventStream(self, polling_interval)
@@ -199,101 +204,137 @@ class AferoBridgeV1:
         """Lookup the account ID associated with the login"""
         if not self._account_id:
             self.logger.debug("Querying API for account id")
-            headers = {"host": v1_const.AFERO_CLIENTS[self._afero_client]["API_HOST"]}
+            headers = {"host": self._client_cfg["API_HOST"]}
             self.logger.debug(
                 "GETURL: %s, Headers: %s",
-                v1_const.AFERO_CLIENTS[self._afero_client]["ACCOUNT_ID_URL"],
+                self._client_cfg["ACCOUNT_ID_URL"],
                 headers,
             )
             res = await self.request(
                 "GET",
-                v1_const.AFERO_CLIENTS[self._afero_client]["ACCOUNT_ID_URL"],
+                self._client_cfg["ACCOUNT_ID_URL"],
                 headers=headers,
             )
             self._account_id = (
-                (await res.json())
+                (await res.json(loads=json_loads))
                 .get("accountAccess")[0]
                 .get("account")
                 .get("accountId")
             )
         return self._account_id
 
+    def _create_web_session(self) -> aiohttp.ClientSession:
+        """Create a session that keeps connections alive between requests"""
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=10,
+            keepalive_timeout=75,
+            ttl_dns_cache=300,
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=60, connect=10),
+        )
+
     async def initialize(self) -> None:
         """Query Afero API for all data"""
+        if self._web_session is None:
+            self._web_session = self._create_web_session()
         await self.get_account_id()
         data = await self.fetch_data()
+        controllers = [
+            controller for controller in self._controllers if not controller.initialized
+        ]
+        buckets = self._partition_devices(data, controllers)
         await asyncio.gather(
             *[
-                controller.initialize(data)
-                for controller in self._controllers
-                if not controller.initialized
+                (
+                    controller.initialize_from_devices(buckets[controller])
+                    if controller in buckets
+                    else controller.initialize(data)
+                )
+                for controller in controllers
             ]
         )
         await self._events.initialize()
 
+    def _partition_devices(
+        self, data: list[dict[Any, str]], controllers: list[BaseResourcesController]
+    ) -> dict[BaseResourcesController, list[AferoDevice]]:
+        """Route each device to the controller that manages it in a single pass
+
+        Controllers without routing keys (ie, DeviceController) need to inspect
+        all data and are not included in the result.
+
+        :param data: Raw data from Afero IoT
+        :param controllers: Controllers that should receive devices
+        """
+        routes: dict[tuple[str, str], BaseResourcesController] = {}
+        buckets: dict[BaseResourcesController, list[AferoDevice]] = {}
+        for controller in controllers:
+            keys = controller.routing_keys()
+            if not keys:
+                continue
+            buckets[controller] = []
+            for key in keys:
+                routes.setdefault(key, controller)
+        type_ids = {type_id for type_id, _ in routes}
+        for element in data:
+            type_id = element["typeId"]
+            if type_id not in type_ids:
+                continue
+            device = get_afero_device(element)
+            controller = routes.get((type_id, device.device_class))
+            if controller is not None:
+                buckets[controller].append(device)
+        return buckets
+
     async def fetch_data(self) -> list[dict[Any, str]]:
         """Query the API"""
         self.logger.debug("Querying API for all data")
         headers = {
-            "host": v1_const.AFERO_CLIENTS[self._afero_client]["DATA_HOST"],
+            "host": self._client_cfg["DATA_HOST"],
         }
         params = {"expansions": "state"}
         res = await self.request(
             "get",
-            v1_const.AFERO_CLIENTS[self._afero_client]["DATA_URL"].format(
-                self.account_id
-            ),
+            self._client_cfg["DATA_URL"].format(self.account_id),
             headers=headers,
             params=params,
         )
         res.raise_for_status()
-        data = await res.json()
+        data = await res.json(loads=json_loads)
         if not isinstance(data, list):
             raise ValueError(data)
         return data
 
-    @asynccontextmanager
-    async def create_request(
-        self, method: str, url: str, **kwargs
-    ) -> Generator[aiohttp.ClientResponse, None, None]:
-        """
-        Make a request to any path with V2 request method (auth in header).
+    async def request(self, method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
+        """Make request on the api and return response data.
 
-        Returns a generator with aiohttp ClientResponse.
+        :param method: HTTP method
+        :param url: URL for the request
         """
-        if self._web_session is None:
-            connector = aiohttp.TCPConnector(
-                limit_per_host=3,
-            )
-            self._web_session = aiohttp.ClientSession(connector=connector)
-
-        try:
-            token = await self._auth.token(self._web_session)
-        except InvalidAuth:
-            self.events.emit(EventType.INVALID_AUTH)
-            raise
-        else:
-            headers = self.get_headers(
-                **{
-                    "authorization": f"Bearer {token}",
-                }
-            )
-            headers.update(kwargs.get("headers", {}))
-            kwargs["headers"] = headers
-            kwargs["ssl"] = True
-            async with self._web_session.request(method, url, **kwargs) as res:
-                yield res
-
-    async def request(self, method: str, url: str, **kwargs) -> aiohttp.ClientResponse:
-        """Make request on the api and return response data."""
         retries = 0
         self.logger.info("Making request [%s] to %s with %s", method, url, kwargs)
+        if self._web_session is None:
+            self._web_session = self._create_web_session()
+        extra_headers = kwargs.pop("headers", {})
         while retries < v1_const.MAX_RETRIES:
             retries += 1
             if retries > 1:
-                retry_wait = 0.25 * retries
+                # Jittered exponential backoff so clients do not retry in lockstep
+                retry_wait = random.uniform(0, min(2.0, 0.25 * (1 << (retries - 1))))
                 await asyncio.sleep(retry_wait)
-            async with self.create_request(method, url, **kwargs) as resp:
+            try:
+                token = await self._auth.token(self._web_session)
+            except InvalidAuth:
+                self.events.emit(EventType.INVALID_AUTH)
+                raise
+            headers = self.get_headers(authorization=f"Bearer {token}")
+            headers.update(extra_headers)
+            async with self._web_session.request(
+                method, url, headers=headers, ssl=True, **kwargs
+            ) as resp:
                 # 503 means the service is temporarily unavailable, back off a bit.
                 # 429 means the bridge is rate limiting/overloaded, we should back off a bit.
                 if resp.status in [429, 503]:
@@ -301,6 +342,7 @@ class AferoBridgeV1:
                 # 403 is bad auth
                 elif resp.status == 403:
                     raise web_exceptions.HTTPForbidden()
+                # Read the body so the connection is returned to the pool
                 await resp.read()
                 return resp
         raise ExceededMaximumRetries("Exceeded maximum number of retries")
@@ -317,11 +359,4 @@ class AferoBridgeV1:
         await controller.update(device_id, states=states)
 
     def get_headers(self, **kwargs):
-        headers: dict[str, str] = {
-            "user-agent": v1_const.AFERO_CLIENTS[self._afero_client][
-                "DEFAULT_USERAGENT"
-            ],
-            "accept-encoding": "gzip",
-        }
-        headers.update(kwargs)
-        return headers
+        return {**self._default_headers, **kwargs}
@@ -1,14 +1,14 @@
 import asyncio
-import copy
+import logging
 import time
 from asyncio.coroutines import iscoroutinefunction
-from dataclasses import dataclass, fields
-from datetime import datetime, timezone
-from typing import TYPE_CHECKING, Callable, Generic, Iterator
+from dataclasses import dataclass, field, fields, is_dataclass, replace
+from functools import lru_cache
+from itertools import count
+from typing import TYPE_CHECKING, Any, Callable, Coroutine, Generic, Iterator
 
 from ...device import AferoDevice, AferoResource, AferoState, get_afero_device
-from ...errors import DeviceNotFound, ExceededMaximumRetries
-from .. import v1_const
+from ...errors import DeviceNotFound, DeviceUpdateError, ExceededMaximumRetries
 from ..models.resource import ResourceTypes
 from .event import AferoEvent, EventCallBackType, EventType
 
@@ -19,9 +19,26 @@ if TYPE_CHECKING:  # pragma: no cover
 EventSubscriptionType = tuple[
     EventCallBackType,
     "tuple[EventType] | None",
+    bool,
 ]
 
 ID_FILTER_ALL = "*"
+# Snapshot entry of a field that is restored as a whole
+_WHOLE_FIELD = object()
+# Snapshot value of a dict entry that did not exist prior to the update
+_MISSING = object()
+
+
+@dataclass(slots=True)
+class _PendingUpdate:
+    """States waiting to be sent to Afero IoT for a device"""
+
+    result: asyncio.Future
+    # Latest state for each functionClass / functionInstance
+    states: dict[tuple[str, str | None], dict] = field(default_factory=dict)
+    # Values of the item prior to the states being applied, keyed by the
+    # field name and dict key
+    snapshot: dict[tuple[str, Any], Any] = field(default_factory=dict)
 
 
 class BaseResourcesController(Generic[AferoResource]):
@@ -32,15 +49,31 @@ class BaseResourcesController(Generic[AferoResource]):
     ITEM_CLS = None
     # functionClass map between controller -> Afero IoT Cloud
     ITEM_MAPPING: dict = {}
+    # Seconds to wait for additional updates to a device before sending them
+    BATCH_INTERVAL: float = 0.01
 
     def __init__(self, bridge: "AferoBridgeV1") -> None:
         """Initialize instance."""
         self._bridge = bridge
         self._items: dict[str, AferoResource] = {}
         self._logger = bridge.logger.getChild(self.ITEM_CLS.__name__)
-        self._subscribers: dict[str, EventSubscriptionType] = {ID_FILTER_ALL: []}
+        self._subscribers: dict[str, dict[int, EventSubscriptionType]] = {
+            ID_FILTER_ALL: {}
+        }
+        self._subscription_ids: Iterator[int] = count()
         self._initialized: bool = False
-        self._item_values = [x.value for x in self.ITEM_TYPES]
+        self._item_values = frozenset(x.value for x in self.ITEM_TYPES)
+        self._event_dispatch: dict[EventType, Callable] = {
+            EventType.RESOURCE_ADDED: self._on_added,
+            EventType.RESOURCE_DELETED: self._on_deleted,
+            EventType.RESOURCE_UPDATED: self._on_updated,
+        }
+        # Updates waiting to be sent, keyed by device_id
+        self._pending_updates: dict[str, _PendingUpdate] = {}
+        # Send updates for a device one at a time so they arrive in order
+        self._update_locks: dict[str, asyncio.Lock] = {}
+        # Keep references to running tasks so they are not garbage collected
+        self._background_tasks: set[asyncio.Task] = set()
 
     def __getitem__(self, device_id: str) -> AferoResource:
         """Get item by device_id."""
@@ -85,29 +118,41 @@ class BaseResourcesController(Generic[AferoResource]):
 
         :return: Item after being processed
         """
-        if evt_type == EventType.RESOURCE_ADDED:
-            self._logger.info(
-                "Initializing %s as a %s", evt_data["device"].id, self.ITEM_CLS.__name__
-            )
-            cur_item = await self.initialize_elem(evt_data["device"])
-            self._items[item_id] = cur_item
-            self._bridge.add_device(evt_data["device"].id, self)
-        elif evt_type == EventType.RESOURCE_DELETED:
-            cur_item = self._items.pop(item_id, evt_data)
-            self._bridge.remove_device(evt_data["device_id"])
-        elif evt_type == EventType.RESOURCE_UPDATED:
-            # existing item updated
-            try:
-                cur_item = self.get_device(item_id)
-            except DeviceNotFound:
-                return
-            if not await self.update_elem(evt_data["device"]) and not evt_data.get(
-                "force_forward", False
-            ):
-                return
-        else:
+        handler = self._event_dispatch.get(evt_type)
+        if handler is None:
             # Skip all other events
             return
+        return await handler(item_id, evt_data)
+
+    async def _on_added(self, item_id: str, evt_data: AferoEvent) -> AferoResource:
+        """Initialize and track a newly discovered item"""
+        device = evt_data["device"]
+        self._logger.info("Initializing %s as a %s", device.id, self.ITEM_CLS.__name__)
+        cur_item = await self.initialize_elem(device)
+        self._items[item_id] = cur_item
+        self._bridge.add_device(device.id, self)
+        return cur_item
+
+    async def _on_deleted(
+        self, item_id: str, evt_data: AferoEvent
+    ) -> AferoResource | AferoEvent:
+        """Stop tracking an item that is no longer reported"""
+        cur_item = self._items.pop(item_id, evt_data)
+        self._bridge.remove_device(evt_data["device_id"])
+        return cur_item
+
+    async def _on_updated(
+        self, item_id: str, evt_data: AferoEvent
+    ) -> AferoResource | None:
+        """Update an existing item with the latest states"""
+        try:
+            cur_item = self.get_device(item_id)
+        except DeviceNotFound:
+            return
+        if not await self.update_elem(evt_data["device"]) and not evt_data.get(
+            "force_forward", False
+        ):
+            return
         return cur_item
 
     async def emit_to_subscribers(
@@ -119,55 +164,99 @@ class BaseResourcesController(Generic[AferoResource]):
         :param item_id: ID of the item
         :param item: Item to emit to subscribers
         """
-        subscribers = (
-            self._subscribers.get(item_id, []) + self._subscribers[ID_FILTER_ALL]
-        )
-        for callback, event_filter in subscribers:
+        subscribers = self._subscribers
+        coros = []
+        # Snapshot the subscriptions as callbacks are able to unsubscribe
+        for callback, event_filter, is_coro in (
+            *subscribers.get(item_id, {}).values(),
+            *subscribers[ID_FILTER_ALL].values(),
+        ):
             if event_filter is not None and evt_type not in event_filter:
                 continue
             # dispatch the full resource object to the callback
-            if iscoroutinefunction(callback):
-                asyncio.create_task(callback(evt_type, item))
+            if is_coro:
+                coros.append(callback(evt_type, item))
             else:
                 callback(evt_type, item)
+        if coros:
+            self._create_background_task(self._dispatch_to_subscribers(coros))
+
+    async def _dispatch_to_subscribers(self, coros: list[Coroutine]) -> None:
+        """Run all coroutine callbacks for an event within a single task"""
+        for result in await asyncio.gather(*coros, return_exceptions=True):
+            if isinstance(result, Exception):
+                self._logger.error(
+                    "Unhandled exception from subscriber", exc_info=result
+                )
+
+    def _create_background_task(self, coro: Coroutine) -> asyncio.Task:
+        """Create a task and hold a reference to it until it completes"""
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
 
     def get_filtered_devices(self, initial_data: list[dict]) -> list[AferoDevice]:
         valid_devices: list[AferoDevice] = []
+        type_id = self.ITEM_TYPE_ID.value
+        item_values = self._item_values
+        log = self._logger.debug
+        debug = self._logger.isEnabledFor(logging.DEBUG)
+        append = valid_devices.append
         for element in initial_data:
-            if element["typeId"] != self.ITEM_TYPE_ID.value:
-                self._logger.debug(
-                    "TypeID [%s] does not match %s",
-                    element["typeId"],
-                    self.ITEM_TYPE_ID.value,
-                )
+            if element["typeId"] != type_id:
+                if debug:
+                    log("TypeID [%s] does not match %s", element["typeId"], type_id)
                 continue
             device = get_afero_device(element)
-            if device.device_class not in self._item_values:
-                self._logger.debug(
-                    "Device Class [%s] is not contained in %s",
-                    device.device_class,
-                    self._item_values,
-                )
+            if device.device_class not in item_values:
+                if debug:
+                    log(
+                        "Device Class [%s] is not contained in %s",
+                        device.device_class,
+                        item_values,
+                    )
                 continue
-            valid_devices.append(device)
+            append(device)
         return valid_devices
 
     async def _get_valid_devices(self, initial_data: list[dict]) -> list[AferoDevice]:
         return self.get_filtered_devices(initial_data)
 
+    def routing_keys(self) -> frozenset[tuple[str, str]]:
+        """Get the (typeId, device_class) pairs this controller manages
+
+        An empty result means the controller must receive all data, either
+        because it has no item types or because it filters devices itself.
+        """
+        if not self._item_values or any(
+            getattr(getattr(self, name), "__func__", None)
+            is not getattr(BaseResourcesController, name)
+            for name in ("get_filtered_devices", "_get_valid_devices")
+        ):
+            return frozenset()
+        type_id = self.ITEM_TYPE_ID.value
+        return frozenset((type_id, device_class) for device_class in self._item_values)
+
     async def initialize(self, initial_data: list[dict]) -> None:
         """Initialize controller by fetching all items for this resource type from bridge."""
         if self._initialized:
             return
         valid_devices: list[AferoDevice] = await self._get_valid_devices(initial_data)
+        await self.initialize_from_devices(valid_devices)
+
+    async def initialize_from_devices(self, valid_devices: list[AferoDevice]) -> None:
+        """Initialize controller from devices that have already been filtered."""
+        if self._initialized:
+            return
         for device in valid_devices:
             await self._handle_event(
                 EventType.RESOURCE_ADDED,
-                AferoEvent(
-                    type=EventType.RESOURCE_ADDED,
-                    device_id=device.id,
-                    device=device,
-                ),
+                {
+                    "type": EventType.RESOURCE_ADDED,
+                    "device_id": device.id,
+                    "device": device,
+                },
             )
         # subscribe to item updates
         res_filter = tuple(x.value for x in self.ITEM_TYPES)
@@ -214,19 +303,20 @@ class BaseResourcesController(Generic[AferoResource]):
         elif not isinstance(id_filter, list | tuple):
             id_filter = (id_filter,)
 
-        subscription = (callback, event_filter)
+        subscription = (callback, event_filter, iscoroutinefunction(callback))
+        subscription_id = next(self._subscription_ids)
 
         for id_key in id_filter:
             if id_key not in self._subscribers:
-                self._subscribers[id_key] = []
-            self._subscribers[id_key].append(subscription)
+                self._subscribers[id_key] = {}
+            self._subscribers[id_key][subscription_id] = subscription
 
         # unsubscribe logic
         def unsubscribe():
             for id_key in id_filter:
                 if id_key not in self._subscribers:
                     continue
-                self._subscribers[id_key].remove(subscription)
+                self._subscribers[id_key].pop(subscription_id, None)
 
         return unsubscribe
 
@@ -234,13 +324,14 @@ class BaseResourcesController(Generic[AferoResource]):
         self, cur_item: AferoResource, device_id: str, states: list[dict]
     ) -> None:
         dev_states = []
+        now_ms = time.time_ns() // 1_000_000
         for state in states:
             dev_states.append(
                 AferoState(
                     functionClass=state["functionClass"],
                     value=state["value"],
                     functionInstance=state.get("functionInstance"),
-                    lastUpdateTime=int(datetime.now(timezone.utc).timestamp() * 1000),
+                    lastUpdateTime=now_ms,
                 )
             )
         dummy_update = AferoDevice(
@@ -272,11 +363,10 @@ class BaseResourcesController(Generic[AferoResource]):
 
         :return: True if successful, False otherwise.
         """
-        url = v1_const.AFERO_CLIENTS[self._bridge.afero_client]["DEVICE_STATE"].format(
-            self._bridge.account_id, str(device_id)
-        )
+        client_cfg = self._bridge._client_cfg
+        url = client_cfg["DEVICE_STATE"].format(self._bridge.account_id, str(device_id))
         headers = {
-            "host": v1_const.AFERO_CLIENTS[self._bridge.afero_client]["DATA_HOST"],
+            "host": client_cfg["DATA_HOST"],
             "content-type": "application/json; charset=utf-8",
         }
         payload = {"metadeviceId": str(device_id), "values": states}
@@ -294,6 +384,86 @@ class BaseResourcesController(Generic[AferoResource]):
                 return False
         return True
 
+    async def _queue_update(
+        self, device_id: str, states: list[dict], snapshot: dict[tuple[str, Any], Any]
+    ) -> bool:
+        """Queue states to be sent with any other updates for the device
+
+        Updates issued within BATCH_INTERVAL are merged into a single request,
+        keeping the latest value for each functionClass / functionInstance.
+
+        :param device_id: Afero IoT Device ID
+        :param states: States to send
+        :param snapshot: Values of the item prior to the states being applied
+
+        :return: True if successful, False otherwise.
+        """
+        pending = self._pending_updates.get(device_id)
+        if pending is None:
+            pending = _PendingUpdate(asyncio.get_running_loop().create_future())
+            self._pending_updates[device_id] = pending
+            task = self._create_background_task(self._flush_update(device_id, pending))
+            task.add_done_callback(lambda _: self._abandon_update(device_id, pending))
+        for key, value in snapshot.items():
+            # Keep the value from before any of the queued states were applied
+            pending.snapshot.setdefault(key, value)
+        for state in states:
+            key = (state["functionClass"], state.get("functionInstance"))
+            # Ensure the latest value is sent last
+            pending.states.pop(key, None)
+            pending.states[key] = state
+        return await asyncio.shield(pending.result)
+
+    async def _flush_update(self, device_id: str, pending: _PendingUpdate) -> None:
+        """Send all queued states for the device once the interval has passed"""
+        try:
+            await asyncio.sleep(self.BATCH_INTERVAL)
+            lock = self._update_locks.setdefault(device_id, asyncio.Lock())
+            async with lock:
+                # Stop accepting states once they are being sent
+                if self._pending_updates.get(device_id) is pending:
+                    del self._pending_updates[device_id]
+                success = await self.update_afero_api(
+                    device_id, list(pending.states.values())
+                )
+        except Exception as err:
+            self._revert_update(device_id, pending)
+            pending.result.set_exception(err)
+        else:
+            if not success:
+                self._revert_update(device_id, pending)
+            pending.result.set_result(success)
+
+    def _abandon_update(self, device_id: str, pending: _PendingUpdate) -> None:
+        """Do not leave callers waiting if the update was cancelled"""
+        if pending.result.done():
+            return
+        self._revert_update(device_id, pending)
+        pending.result.set_exception(
+            DeviceUpdateError(f"Update for {device_id} was cancelled")
+        )
+
+    def _revert_update(self, device_id: str, pending: _PendingUpdate) -> None:
+        """Restore the values of the item prior to an unsuccessful update
+
+        Entries that are also modified by an update that has not been sent yet
+        are restored if that update is unsuccessful as well.
+
+        :param device_id: Afero IoT Device ID
+        :param pending: Update that was unsuccessful
+        """
+        if self._pending_updates.get(device_id) is pending:
+            del self._pending_updates[device_id]
+        cur_item = self._items.get(device_id)
+        if cur_item is None:
+            return
+        queued = self._pending_updates.get(device_id)
+        for key, value in pending.snapshot.items():
+            if queued is not None and key in queued.snapshot:
+                queued.snapshot[key] = value
+            else:
+                _restore_entry(cur_item, key, value)
+
     async def update(
         self,
         device_id: str,
@@ -302,6 +472,10 @@ class BaseResourcesController(Generic[AferoResource]):
     ) -> None:
         """Update Afero IoT with the new data
 
+        The item is updated immediately, so updates issued before the request
+        completes are compared against it, and is restored if the request is
+        unsuccessful.
+
         :param device_id: Afero IoT Device ID
         :param obj_in: Afero IoT Resource elements to change
         :param states: States to manually set
@@ -313,21 +487,21 @@ class BaseResourcesController(Generic[AferoResource]):
                 "Unable to update device %s as it does not exist", device_id
             )
             return
-        # Make a clone to restore if the update fails
-        fallback = copy.deepcopy(cur_item)
         if obj_in:
             device_states = dataclass_to_afero(cur_item, obj_in, self.ITEM_MAPPING)
             if not device_states:
                 self._logger.debug("No states to send. Skipping")
                 return
+            # Capture the fields to restore if the update fails
+            snapshot = _snapshot_fields(cur_item, obj_in)
             # Update the state of the item to match the new states
             update_dataclass(cur_item, obj_in)
         else:  # Manually setting states
             device_states = states
+            snapshot = _snapshot_states(cur_item, states, self.ITEM_MAPPING)
             await self._process_state_update(cur_item, device_id, states)
         # @TODO - Implement bluetooth logic for update
-        if not await self.update_afero_api(device_id, device_states):
-            self._items[device_id] = fallback
+        await self._queue_update(device_id, device_states, snapshot)
 
     def get_device(self, device_id) -> AferoResource:
         try:
@@ -336,19 +510,108 @@ class BaseResourcesController(Generic[AferoResource]):
             raise DeviceNotFound(device_id)
 
 
+@lru_cache(maxsize=None)
+def _field_names(dataclass_type: type) -> tuple[str, ...]:
+    """Lookup the field names of a dataclass type, which do not change once defined"""
+    return tuple(f.name for f in fields(dataclass_type))
+
+
+def _snapshot_fields(
+    cur_item: AferoResource, obj_in: dataclass
+) -> dict[tuple[str, Any], Any]:
+    """Capture the entries of the element that an update will modify
+
+    Dict fields are captured per entry, so restoring the snapshot does not
+    undo changes made to other entries.
+
+    :param cur_item: Element that will be updated
+    :param obj_in: Elements being changed
+
+    :return: Mapping of (field name, dict key) to the value to restore
+    """
+    snapshot = {}
+    for name in _field_names(type(obj_in)):
+        new_val = getattr(obj_in, name, None)
+        if new_val is None:
+            continue
+        cur_val = getattr(cur_item, name)
+        if isinstance(cur_val, dict):
+            # update_dataclass replaces the entry of the functionInstance
+            key = getattr(new_val, "func_instance", None)
+            snapshot[(name, key)] = cur_val.get(key, _MISSING)
+        else:
+            snapshot[(name, _WHOLE_FIELD)] = cur_val
+    return snapshot
+
+
+def _snapshot_states(
+    cur_item: AferoResource, states: list[dict], mapping: dict
+) -> dict[tuple[str, Any], Any]:
+    """Capture the entries of the element that the states will modify
+
+    An entry is modified by a state if its field maps to the functionClass or
+    its feature uses the functionClass. Dict entries must also match the
+    functionInstance. Features are copied, as states modify them in-place.
+
+    :param cur_item: Element that will be updated
+    :param states: States being applied
+    :param mapping: functionClass map between controller -> Afero IoT Cloud
+
+    :return: Mapping of (field name, dict key) to the value to restore
+    """
+    func_classes = {state["functionClass"] for state in states}
+    func_instances = {
+        (state["functionClass"], state.get("functionInstance")) for state in states
+    }
+    snapshot = {}
+    for name in _field_names(type(cur_item)):
+        value = getattr(cur_item, name)
+        func_class = mapping.get(name, name)
+        if isinstance(value, dict):
+            for key, feature in value.items():
+                if (func_class, key) in func_instances or (
+                    getattr(feature, "func_class", None),
+                    key,
+                ) in func_instances:
+                    snapshot[(name, key)] = _copy_feature(feature)
+        elif (
+            func_class in func_classes
+            or getattr(value, "func_class", None) in func_classes
+        ):
+            snapshot[(name, _WHOLE_FIELD)] = _copy_feature(value)
+    return snapshot
+
+
+def _copy_feature(value: Any) -> Any:
+    """Shallow copy a feature so in-place changes can be reverted"""
+    if is_dataclass(value) and not isinstance(value, type):
+        return replace(value)
+    return value
+
+
+def _restore_entry(cur_item: AferoResource, key: tuple[str, Any], value: Any):
+    """Restore a single entry of the element from a snapshot"""
+    name, entry = key
+    if entry is _WHOLE_FIELD:
+        setattr(cur_item, name, value)
+    elif value is _MISSING:
+        getattr(cur_item, name).pop(entry, None)
+    else:
+        getattr(cur_item, name)[entry] = value
+
+
 def update_dataclass(elem: AferoResource, update_vals: dataclass):
     """Updates the element with the latest changes"""
-    for f in fields(update_vals):
-        cur_val = getattr(update_vals, f.name, None)
-        elem_val = getattr(elem, f.name)
+    for name in _field_names(type(update_vals)):
+        cur_val = getattr(update_vals, name, None)
         if cur_val is None:
             continue
+        elem_val = getattr(elem, name)
         # Special processing for dicts
         if isinstance(elem_val, dict):
-            cur_val = {getattr(cur_val, "func_instance", None): cur_val}
-            getattr(elem, f.name).update(cur_val)
+            elem_val[getattr(cur_val, "func_instance", None)] = cur_val
         else:
-            setattr(elem, f.name, cur_val)
+            setattr(elem, name, cur_val)
 
 
 def dataclass_to_afero(
@@ -356,27 +619,24 @@ def dataclass_to_afero(
 ) -> list[dict]:
     """Convert the current state to be consumed by Afero IoT"""
     states = []
-    for f in fields(cls):
-        cur_val = getattr(cls, f.name, None)
+    now = time.time_ns() // 1_000_000_000
+    get_instance = getattr(elem, "get_instance", None)
+    for name in _field_names(type(cls)):
+        cur_val = getattr(cls, name, None)
         if cur_val is None:
             continue
-        if cur_val == getattr(elem, f.name, None):
+        if cur_val == getattr(elem, name, None):
             continue
-        api_key = mapping.get(f.name, f.name)
+        api_key = mapping.get(name, name)
         new_val = cur_val.api_value
         if not isinstance(new_val, list):
             new_val = [new_val]
+        instance = get_instance(api_key) if get_instance is not None else None
         for val in new_val:
-            if hasattr(f, "func_instance"):
-                instance = getattr(cur_val, "func_instance", None)
-            elif hasattr(elem, "get_instance"):
-                instance = elem.get_instance(api_key)
-            else:
-                instance = None
             new_state = {
                 "functionClass": api_key,
                 "functionInstance": instance,
-                "lastUpdateTime": int(time.time()),
+                "lastUpdateTime": now,
                 "value": None,
             }
             if isinstance(val, dict):
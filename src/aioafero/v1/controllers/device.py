@@ -1,5 +1,6 @@
 """Controller that holds top-level devices"""
 
+import logging
 import re
 from typing import Any
 
@@ -87,13 +88,15 @@ class DeviceController(BaseResourcesController[Device]):
         """Find parent devices"""
         parents: dict = {}
         potential_parents: dict = {}
+        debug = self._logger.isEnabledFor(logging.DEBUG)
         for element in initial_data:
             if element["typeId"] != self.ITEM_TYPE_ID.value:
-                self._logger.debug(
-                    "TypeID [%s] does not match %s",
-                    element["typeId"],
-                    self.ITEM_TYPE_ID.value,
-                )
+                if debug:
+                    self._logger.debug(
+                        "TypeID [%s] does not match %s",
+                        element["typeId"],
+                        self.ITEM_TYPE_ID.value,
+                    )
                 continue
             device: AferoDevice = get_afero_device(element)
             if device.children:
@@ -103,7 +106,7 @@ class DeviceController(BaseResourcesController[Device]):
                 and device.device_id not in potential_parents
             ):
                 potential_parents[device.device_id] = device
-            else:
+            elif debug:
                 self._logger.debug("skipping %s as its tracked", device.device_id)
         for potential_parent in potential_parents.values():
             if potential_parent.device_id not in parents:
@@ -58,6 +58,7 @@ class EventStream:
         self._event_queue = asyncio.Queue()
         self._status = EventStreamStatus.DISCONNECTED
         self._bg_tasks: list[asyncio.Task] = []
+        self._callback_tasks: set[asyncio.Task] = set()
         self._subscribers: list[EventSubscriptionType] = []
         self._logger = bridge.logger.getChild("events")
         self._polling_interval: int = polling_interval
@@ -99,6 +100,22 @@ class EventStream:
         self._status = EventStreamStatus.DISCONNECTED
         self._bg_tasks = []
 
+    async def wait_idle(self) -> None:
+        """Wait until emitted events have been processed by their subscribers
+
+        Queued events are only waited on while the event processor is running.
+        """
+        if self._bg_tasks:
+            await self._event_queue.join()
+        # Callbacks are able to emit additional events
+        while self._callback_tasks:
+            pending = {task for task in self._callback_tasks if not task.done()}
+            if pending:
+                await asyncio.wait(pending)
+            else:
+                # Allow the done callbacks of finished tasks to run
+                await asyncio.sleep(0)
+
     def subscribe(
         self,
         callback: EventCallBackType,
@@ -152,7 +169,9 @@ class EventStream:
                 ):
                     continue
                 if iscoroutinefunction(callback):
-                    asyncio.create_task(callback(event_type, data))
+                    task = asyncio.create_task(callback(event_type, data))
+                    self._callback_tasks.add(task)
+                    task.add_done_callback(self._callback_tasks.discard)
                 else:
                     callback(event_type, data)
             except Exception:
@@ -226,12 +245,12 @@ class EventStream:
             if device.id not in self._bridge.tracked_devices:
                 event_type = EventType.RESOURCE_ADDED
             self._event_queue.put_nowait(
-                AferoEvent(
-                    type=event_type,
-                    device_id=device.id,
-                    device=device,
-                    force_forward=False,
-                )
+                {
+                    "type": event_type,
+                    "device_id": device.id,
+                    "device": device,
+                    "force_forward": False,
+                }
             )
             processed_ids.append(device.id)
         # Handle devices that did not report in from the API
@@ -263,11 +282,13 @@ class EventStream:
             await asyncio.sleep(self._polling_interval)
 
     async def process_event(self):
+        event: AferoEvent = await self._event_queue.get()
         try:
-            event: AferoEvent = await self._event_queue.get()
             self.emit(event["type"], event)
         except Exception:
             self._logger.exception("Unhandled exception. Please open a bug report")
+        finally:
+            self._event_queue.task_done()
 
     async def __event_processor(self) -> None:
         """Process the Afero IoT devices"""
@@ -89,12 +89,14 @@ class LightController(BaseResourcesController[Light]):
                 if isinstance(current_temp, str) and current_temp.endswith("K"):
                     current_temp = current_temp[:-1]
                 color_temp = features.ColorTemperatureFeature(
-                    temperature=int(current_temp), supported=avail_temps, prefix=prefix
+                    temperature=int(current_temp),
+                    supported=tuple(avail_temps),
+                    prefix=prefix,
                 )
             elif state.functionClass == "brightness":
                 temp_bright = process_range(func_def["values"][0])
                 dimming = features.DimmingFeature(
-                    brightness=int(state.value), supported=temp_bright
+                    brightness=int(state.value), supported=tuple(temp_bright)
                 )
             elif state.functionClass == "color-sequence":
                 current_effect = state.value
@@ -34,7 +34,7 @@ class LockController(BaseResourcesController[Lock]):
         for state in afero_device.states:
             if state.functionClass == "lock-control":
                 current_position = features.CurrentPositionFeature(
-                    position=features.CurrentPositionEnum(state.value)
+                    position=features.to_position(state.value)
                 )
             elif state.functionClass == "available":
                 available = state.value
@@ -62,10 +62,10 @@ class LockController(BaseResourcesController[Lock]):
         updated_keys = set()
         for state in afero_device.states:
             if state.functionClass == "lock-control":
-                new_val = features.CurrentPositionEnum(state.value)
+                new_val = features.to_position(state.value)
                 if cur_item.position.position != new_val:
                     updated_keys.add("position")
-                cur_item.position.position = features.CurrentPositionEnum(state.value)
+                cur_item.position.position = features.to_position(state.value)
             elif state.functionClass == "available":
                 if cur_item.available != state.value:
                     updated_keys.add("available")
@@ -84,20 +84,24 @@ class SwitchController(BaseResourcesController[Switch]):
         on: bool | None = None,
         instance: str | None = None,
     ) -> None:
-        """Set supported feature(s) to fan resource."""
-        update_obj = SwitchPut()
+        """Set supported feature(s) to switch resource."""
         try:
             cur_item = self.get_device(device_id)
         except errors.DeviceNotFound:
             self._logger.info("Unable to find device %s", device_id)
             return
-        if on is not None:
-            try:
-                update_obj.on = features.OnFeature(
-                    on=on,
-                    func_class=cur_item.on[instance].func_class,
-                    func_instance=instance,
-                )
-            except KeyError:
-                self._logger.info("Unable to find instance %s", instance)
+        if on is None:
+            self._logger.debug("No states to send. Skipping")
+            return
+        cur_feature = cur_item.on.get(instance)
+        if cur_feature is None:
+            self._logger.info("Unable to find instance %s", instance)
+            return
+        update_obj = SwitchPut(
+            on=features.OnFeature(
+                on=on,
+                func_class=cur_feature.func_class,
+                func_instance=instance,
+            )
+        )
         await self.update(device_id, obj_in=update_obj)
@@ -1,12 +1,13 @@
 """Feature Schemas used by various Afero resources."""
 
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import StrEnum
+from functools import lru_cache
 
 from ...util import percentage_to_ordered_list_item
 
 
-@dataclass
+@dataclass(slots=True)
 class ColorModeFeature:
     """Represent the current mode (ie white, color) Feature object"""
 
@@ -17,41 +18,57 @@ class ColorModeFeature:
         return self.mode
 
 
-@dataclass
+@dataclass(slots=True)
 class ColorFeature:
     """Represent `RGB` Feature object"""
 
     red: int
     green: int
     blue: int
+    # Last generated value and the color it was generated from. The color
+    # is mutated in-place by the controller so the cache is keyed on it.
+    _api: dict | None = field(default=None, init=False, repr=False, compare=False)
+    _api_rgb: tuple[int, int, int] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def api_value(self):
-        return {
-            "value": {
-                "color-rgb": {
-                    "r": self.red,
-                    "g": self.green,
-                    "b": self.blue,
+        rgb = (self.red, self.green, self.blue)
+        if rgb != self._api_rgb:
+            self._api = {
+                "value": {
+                    "color-rgb": {
+                        "r": self.red,
+                        "g": self.green,
+                        "b": self.blue,
+                    }
                 }
             }
-        }
+            self._api_rgb = rgb
+        return self._api
 
 
-@dataclass
+@dataclass(slots=True)
 class ColorTemperatureFeature:
     """Represent Current temperature Feature"""
 
     temperature: int
-    supported: list[int]
+    supported: tuple[int, ...]
     prefix: str | None = None
 
     @property
     def api_value(self):
-        return f"{self.temperature}{self.prefix}"
+        return _fmt_temp(self.temperature, self.prefix)
+
 
+@lru_cache(maxsize=128)
+def _fmt_temp(temperature: int, prefix: str | None) -> str:
+    """Cached formatting of a color temperature for Afero IoT"""
+    return f"{temperature}{prefix}"
 
-class CurrentPositionEnum(Enum):
+
+class CurrentPositionEnum(StrEnum):
     """Enum with available current position modes."""
 
     LOCKED = "locked"
@@ -65,7 +82,20 @@ class CurrentPositionEnum(Enum):
         return cls.UNKNOWN
 
 
-@dataclass
+_POS_LOOKUP: dict[str, CurrentPositionEnum] = {
+    member.value: member for member in CurrentPositionEnum
+}
+
+
+def to_position(value: str) -> CurrentPositionEnum:
+    """Convert the value from Afero IoT to a position
+
+    :param value: Value reported by Afero IoT
+    """
+    return _POS_LOOKUP.get(value, CurrentPositionEnum.UNKNOWN)
+
+
+@dataclass(slots=True)
 class CurrentPositionFeature:
     """Represents the current position of the lock"""
 
@@ -73,22 +103,22 @@ class CurrentPositionFeature:
 
     @property
     def api_value(self):
-        return self.position.value
+        return self.position
 
 
-@dataclass
+@dataclass(slots=True)
 class DimmingFeature:
     """Represent Current temperature Feature"""
 
     brightness: int
-    supported: list[int]
+    supported: tuple[int, ...]
 
     @property
     def api_value(self):
         return self.brightness
 
 
-@dataclass
+@dataclass(slots=True)
 class DirectionFeature:
     """Represent Current Fan direction Feature"""
 
@@ -99,24 +129,33 @@ class DirectionFeature:
         return "forward" if self.forward else "reverse"
 
 
-@dataclass
+_NO_EFFECTS: frozenset[str] = frozenset()
+
+
+@dataclass(slots=True)
 class EffectFeature:
     """Represent the current effect"""
 
     effect: str
     effects: dict[str, set[str]]
+    # effect -> first group that contains it
+    _index: dict[str, str] = field(init=False, repr=False, compare=False)
+    _preset_set: set[str] | frozenset[str] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self._index = {}
+        for effect_group, effects in self.effects.items():
+            for effect in effects:
+                self._index.setdefault(effect, effect_group)
+        self._preset_set = self.effects.get("preset", _NO_EFFECTS)
 
     @property
     def api_value(self):
         states = []
-        seq_key = None
-        for effect_group, effects in self.effects.items():
-            if self.effect not in effects:
-                continue
-            else:
-                seq_key = effect_group
-                break
-        preset_val = self.effect if self.effect in self.effects["preset"] else seq_key
+        seq_key = self._index.get(self.effect)
+        preset_val = self.effect if self.effect in self._preset_set else seq_key
         states.append(
             {
                 "functionClass": "color-sequence",
@@ -135,13 +174,10 @@ class EffectFeature:
         return states
 
     def is_preset(self, effect):
-        try:
-            return effect in self.effects["preset"]
-        except KeyError:
-            return False
+        return effect in self._preset_set
 
 
-@dataclass
+@dataclass(slots=True)
 class ModeFeature:
     """Represent Current Fan mode Feature"""
 
@@ -153,68 +189,99 @@ class ModeFeature:
         return self.mode
 
 
-@dataclass
+def _toggle_states(func_class: str | None, func_instance: str | None):
+    """Generate the off / on states for a toggleable feature
+
+    :param func_class: functionClass for the states
+    :param func_instance: functionInstance for the states
+    """
+    states = []
+    for value in ("off", "on"):
+        state = {
+            "value": value,
+            "functionClass": func_class,
+        }
+        if func_instance:
+            state["functionInstance"] = func_instance
+        states.append(state)
+    return tuple(states)
+
+
+@dataclass(slots=True)
 class OnFeature:
     """Represent `On` Feature object as used by various Afero resources."""
 
     on: bool
     func_class: str | None = field(default="power")
     func_instance: str | None = field(default=None)
+    _api: tuple[dict, dict] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._api = _toggle_states(self.func_class, self.func_instance)
 
     @property
     def api_value(self):
-        state = {
-            "value": "on" if self.on else "off",
-            "functionClass": self.func_class,
-        }
-        if self.func_instance:
-            state["functionInstance"] = self.func_instance
-        return state
+        return self._api[1 if self.on else 0]
 
 
-@dataclass
+@dataclass(slots=True)
 class OpenFeature:
     """Represent `Open` Feature object"""
 
     open: bool
     func_class: str | None = field(default="toggle")
     func_instance: str | None = field(default=None)
+    _api: tuple[dict, dict] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._api = _toggle_states(self.func_class, self.func_instance)
 
     @property
     def api_value(self):
-        state = {
-            "value": "on" if self.open else "off",
-            "functionClass": self.func_class,
-        }
-        if self.func_instance:
-            state["functionInstance"] = self.func_instance
-        return state
+        return self._api[1 if self.open else 0]
 
 
-@dataclass
+@dataclass(slots=True)
 class PresetFeature:
     """Represent the current preset"""
 
     enabled: bool
     func_instance: str
     func_class: str
+    _api: tuple[dict, dict] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._api = tuple(
+            {
+                "functionClass": self.func_class,
+                "functionInstance": self.func_instance,
+                "value": value,
+            }
+            for value in ("disabled", "enabled")
+        )
 
     @property
     def api_value(self):
-        return {
-            "functionClass": self.func_class,
-            "functionInstance": self.func_instance,
-            "value": "enabled" if self.enabled else "disabled",
-        }
+        return self._api[1 if self.enabled else 0]
 
 
-@dataclass
+@dataclass(slots=True)
 class SpeedFeature:
     """Represent Current Fan speed Feature"""
 
     speed: int
     speeds: list[str]
+    _speeds: tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self._speeds = tuple(self.speeds)
 
     @property
     def api_value(self):
-        return percentage_to_ordered_list_item(self.speeds, self.speed)
+        return _speed_lookup(self._speeds, self.speed)
+
+
+@lru_cache(maxsize=256)
+def _speed_lookup(speeds: tuple[str, ...], speed: int) -> str:
+    """Cached lookup of the speed that matches the percentage"""
+    return percentage_to_ordered_list_item(speeds, speed)
@@ -1,16 +1,18 @@
 from dataclasses import dataclass, field
 
-MAPPED_SENSORS = [
-    "battery-level",
-    "output-voltage-switch",
-    "watts",
-    "wifi-rssi",
-]
+MAPPED_SENSORS = frozenset(
+    {
+        "battery-level",
+        "output-voltage-switch",
+        "watts",
+        "wifi-rssi",
+    }
+)
 
-BINARY_SENSORS = ["error"]
+BINARY_SENSORS = frozenset({"error"})
 
 
-@dataclass
+@dataclass(slots=True)
 class AferoSensor:
     id: str
     owner: str
@@ -24,14 +26,9 @@ class AferoSensor:
         return self._value
 
 
-@dataclass
-class AferoSensorError:
-    id: str
-    owner: str
-    _value: str
-
-    unit: str | None = field(default=None)
-    instance: str | None = field(default=None)
+@dataclass(slots=True)
+class AferoSensorError(AferoSensor):
+    """Sensor that reports True when alerting"""
 
     @property
     def value(self) -> bool:
@@ -11,6 +11,19 @@ from aioafero.v1.controllers.event import EventType
 
 @pytest.fixture
 def mocked_bridge(mocker):
+    yield create_mocked_bridge(mocker)
+
+
+@pytest.fixture(scope="module")
+def module_mocked_bridge(module_mocker):
+    """mocked_bridge that is shared across a module
+
+    Tests using this fixture must reset it with utils.reset_mocked_bridge.
+    """
+    yield create_mocked_bridge(module_mocker)
+
+
+def create_mocked_bridge(mocker) -> AferoBridgeV1:
     bridge: AferoBridgeV1 = AferoBridgeV1("username2", "password2")
     mocker.patch.object(
         bridge,
@@ -32,11 +45,25 @@ def mocked_bridge(mocker):
     bridge.emit_event = emit_event
     bridge.__aenter__ = mocker.AsyncMock(return_value=bridge)
     bridge.__aexit__ = mocker.AsyncMock()
-    yield bridge
+    return bridge
 
 
 @pytest.fixture
 def mocked_bridge_req(mocker):
+    yield create_mocked_bridge_req(mocker)
+
+
+@pytest.fixture(scope="module")
+def module_mocked_bridge_req(module_mocker):
+    """mocked_bridge_req that is shared across a module
+
+    Tests using this fixture are responsible for resetting any state
+    they modify.
+    """
+    yield create_mocked_bridge_req(module_mocker)
+
+
+def create_mocked_bridge_req(mocker) -> AferoBridgeV1:
     bridge: AferoBridgeV1 = AferoBridgeV1("username2", "password2")
     mocker.patch.object(
         bridge,
@@ -62,7 +89,7 @@ def mocked_bridge_req(mocker):
     bridge.emit_event = emit_event
     bridge.__aenter__ = mocker.AsyncMock(return_value=bridge)
     bridge.__aexit__ = mocker.AsyncMock()
-    yield bridge
+    return bridge
 
 
 @pytest_asyncio.fixture
@@ -0,0 +1,24 @@
+import pytest
+
+from .. import utils
+
+
+@pytest.fixture(scope="session")
+def raw_hs_data():
+    """Parsed raw_hs_data.json shared across the session
+
+    The data is shared between tests so it must not be modified.
+    """
+    return utils.get_raw_dump("raw_hs_data.json")
+
+
+@pytest.fixture(scope="module")
+def frozen_time():
+    """Freeze time.time_ns at 12345 seconds for every test in a module
+
+    The function is replaced on the time module itself, so every caller sees
+    the frozen value, not only the controllers.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr("time.time_ns", lambda: 12345 * 1_000_000_000)
+        yield
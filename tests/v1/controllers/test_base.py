@@ -1,11 +1,15 @@
+import asyncio
 import logging
+from copy import deepcopy
 from dataclasses import dataclass, field, replace
 
 import pytest
+import pytest_asyncio
+from aioresponses import aioresponses
 
 from aioafero import AferoDevice, AferoState
 from aioafero.device import get_afero_device
-from aioafero.errors import DeviceNotFound, ExceededMaximumRetries
+from aioafero.errors import DeviceNotFound, DeviceUpdateError, ExceededMaximumRetries
 from aioafero.v1 import AferoBridgeV1, models, v1_const
 from aioafero.v1.controllers import event
 from aioafero.v1.controllers.base import BaseResourcesController, update_dataclass
@@ -13,8 +17,10 @@ from aioafero.v1.models.resource import DeviceInformation
 
 from .. import utils
 
+pytestmark = pytest.mark.usefixtures("frozen_time")
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class TestFeatureBool:
     on: bool
 
@@ -23,7 +29,7 @@ class TestFeatureBool:
         return self.on
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TestFeatureInstance:
     on: bool
     func_instance: str | None
@@ -37,7 +43,7 @@ class TestFeatureInstance:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class TestResource:
     id: str
     available: bool
@@ -46,7 +52,7 @@ class TestResource:
     device_information: DeviceInformation = field(default_factory=DeviceInformation)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TestResourcePut:
     on: TestFeatureBool | None
     beans: TestFeatureInstance | None
@@ -75,74 +81,43 @@ test_res_update = TestResource(
 )
 
 
-test_device = AferoDevice(
-    id="cool",
-    device_id="cool-parent",
-    model="bean",
-    device_class="jumping",
-    default_name="bean",
-    default_image="bean",
-    friendly_name="bean",
-    states=[
-        AferoState(
-            functionClass="power",
-            value="on",
-            lastUpdateTime=0,
-            functionInstance=None,
-        ),
-        AferoState(
-            functionClass="mapped_beans",
-            value="on",
-            lastUpdateTime=0,
-        ),
-        AferoState(
-            functionClass="mapped_beans",
-            value="on",
-            lastUpdateTime=0,
-            functionInstance="bean1",
-        ),
-        AferoState(
-            functionClass="mapped_beans",
-            value="off",
-            lastUpdateTime=0,
-            functionInstance="bean2",
-        ),
-    ],
-)
+# functionClass, functionInstance, value
+_test_device_states = [
+    ("power", None, "on"),
+    ("mapped_beans", None, "on"),
+    ("mapped_beans", "bean1", "on"),
+    ("mapped_beans", "bean2", "off"),
+]
 
-test_device_update = AferoDevice(
-    id="cool",
-    device_id="cool-parent",
-    model="bean",
-    device_class="jumping",
-    default_name="bean",
-    default_image="bean",
-    friendly_name="bean",
-    states=[
-        AferoState(
-            functionClass="power",
-            value="on",
-            lastUpdateTime=0,
-            functionInstance=None,
-        ),
-        AferoState(
-            functionClass="mapped_beans",
-            value="on",
-            lastUpdateTime=0,
-        ),
-        AferoState(
-            functionClass="mapped_beans",
-            value="on",
-            lastUpdateTime=0,
-            functionInstance="bean1",
-        ),
-        AferoState(
-            functionClass="mapped_beans",
-            value="on",
-            lastUpdateTime=0,
-            functionInstance="bean2",
-        ),
-    ],
+
+def _create_test_device(states: list[tuple[str, str | None, str]]) -> AferoDevice:
+    return AferoDevice(
+        id="cool",
+        device_id="cool-parent",
+        model="bean",
+        device_class="jumping",
+        default_name="bean",
+        default_image="bean",
+        friendly_name="bean",
+        states=[
+            AferoState(
+                functionClass=func_class,
+                functionInstance=func_instance,
+                value=value,
+                lastUpdateTime=0,
+            )
+            for func_class, func_instance, value in states
+        ],
+    )
+
+
+test_device = _create_test_device(_test_device_states)
+# All beans are on
+test_device_update = _create_test_device(
+    [
+        (func_class, func_instance, "on")
+        for func_class, func_instance, _ in _test_device_states
+    ]
 )
 
 
@@ -155,15 +130,19 @@ class Example1ResourceController(BaseResourcesController):
     async def initialize_elem(self, afero_dev: AferoDevice) -> TestResource:
         """Initialize the element"""
         self._logger.info("Initializing %s", afero_dev.id)
-        on: TestFeatureBool | None = None
-        beans: dict[str | None, TestFeatureInstance] = {}
+        by_class: dict[str, list[AferoState]] = {}
         for state in afero_dev.states:
-            if state.functionClass == "power":
-                on = TestFeatureBool(on=state.value == "on")
-            elif state.functionClass == "mapped_beans":
-                beans[state.functionInstance] = TestFeatureInstance(
-                    on=state.value == "on", func_instance=state.functionInstance
-                )
+            by_class.setdefault(state.functionClass, []).append(state)
+        on: TestFeatureBool | None = None
+        if power := by_class.get("power"):
+            on = TestFeatureBool(on=power[-1].value == "on")
+        feature_instance = TestFeatureInstance
+        beans: dict[str | None, TestFeatureInstance] = {
+            state.functionInstance: feature_instance(
+                on=state.value == "on", func_instance=state.functionInstance
+            )
+            for state in by_class.get("mapped_beans", ())
+        }
         return TestResource(
             id=afero_dev.id,
             available=True,
@@ -179,18 +158,33 @@ class Example1ResourceController(BaseResourcesController):
                 new_val = state.value == "on"
                 if cur_item.on.on != new_val:
                     updated_keys.add("on")
-                    cur_item.on.on = new_val
+                    cur_item.on = TestFeatureBool(on=new_val)
             elif state.functionClass == "mapped_beans":
                 new_val = state.value == "on"
                 if cur_item.beans[state.functionInstance].on != new_val:
                     updated_keys.add("on")
-                    cur_item.beans[state.functionInstance].on = state.value == "on"
+                    cur_item.beans[state.functionInstance] = TestFeatureInstance(
+                        on=new_val, func_instance=state.functionInstance
+                    )
         return updated_keys
 
 
 @pytest.fixture
-def ex1_rc(mocked_bridge_req):
-    yield Example1ResourceController(mocked_bridge_req)
+def ex1_rc(module_mocked_bridge_req):
+    """New controller on the shared bridge, which is reset afterwards"""
+    bridge = module_mocked_bridge_req
+    request_side_effect = bridge.request.side_effect
+    yield Example1ResourceController(bridge)
+    utils.reset_mocked_bridge(bridge)
+    bridge.request.side_effect = request_side_effect
+
+
+@pytest_asyncio.fixture
+async def ex1_rc_with_device(ex1_rc):
+    """ex1_rc that is tracking test_device"""
+    ex1_rc._items[test_device.id] = await ex1_rc.initialize_elem(test_device)
+    ex1_rc._bridge.add_device(test_device.id, ex1_rc)
+    yield ex1_rc
 
 
 def test_init(ex1_rc):
@@ -211,156 +205,187 @@ def test_basic(ex1_rc):
     assert ex1_rc.items == ["beans"]
 
 
-@pytest.mark.asyncio
-@pytest.mark.parametrize(
-    "init_elem, evt_type, item_id, evt_data, expected_devs, expected_return",
-    [
-        # Device added
-        (
-            [],
-            event.EventType.RESOURCE_ADDED,
-            test_device.id,
-            event.AferoEvent(
-                type=event.EventType.RESOURCE_ADDED,
-                device_id=test_device.id,
-                device=test_device,
-                force_forward=False,
-            ),
-            {test_device.id},
-            replace(test_res),
+# init_elem, evt_type, item_id, evt_data, expected_devs, expected_return
+HANDLE_EVENT_TYPE_CASES = [
+    # Device added
+    (
+        [],
+        event.EventType.RESOURCE_ADDED,
+        test_device.id,
+        event.AferoEvent(
+            type=event.EventType.RESOURCE_ADDED,
+            device_id=test_device.id,
+            device=test_device,
+            force_forward=False,
         ),
-        # Device not found
-        (
-            [],
-            event.EventType.RESOURCE_UPDATED,
-            test_device.id,
-            event.AferoEvent(
-                type=event.EventType.RESOURCE_UPDATED,
-                device_id=test_device.id,
-                device=test_device_update,
-                force_forward=False,
-            ),
-            set(),
-            None,
+        {test_device.id},
+        test_res,
+    ),
+    # Device not found
+    (
+        [],
+        event.EventType.RESOURCE_UPDATED,
+        test_device.id,
+        event.AferoEvent(
+            type=event.EventType.RESOURCE_UPDATED,
+            device_id=test_device.id,
+            device=test_device_update,
+            force_forward=False,
         ),
-        # Device updated with changes
-        (
-            [test_device],
-            event.EventType.RESOURCE_UPDATED,
-            test_device.id,
-            event.AferoEvent(
-                type=event.EventType.RESOURCE_UPDATED,
-                device_id=test_device.id,
-                device=test_device_update,
-                force_forward=False,
-            ),
-            {test_device.id},
-            replace(test_res_update),
+        set(),
+        None,
+    ),
+    # Device updated with changes
+    (
+        [test_device],
+        event.EventType.RESOURCE_UPDATED,
+        test_device.id,
+        event.AferoEvent(
+            type=event.EventType.RESOURCE_UPDATED,
+            device_id=test_device.id,
+            device=test_device_update,
+            force_forward=False,
         ),
-        # Device updated with no changes + dont force
-        (
-            [test_device],
-            event.EventType.RESOURCE_UPDATED,
-            test_device.id,
-            event.AferoEvent(
-                type=event.EventType.RESOURCE_UPDATED,
-                device_id=test_device.id,
-                device=test_device,
-                force_forward=False,
-            ),
-            {test_device.id},
-            None,
+        {test_device.id},
+        test_res_update,
+    ),
+    # Device updated with no changes + dont force
+    (
+        [test_device],
+        event.EventType.RESOURCE_UPDATED,
+        test_device.id,
+        event.AferoEvent(
+            type=event.EventType.RESOURCE_UPDATED,
+            device_id=test_device.id,
+            device=test_device,
+            force_forward=False,
         ),
-        # Device updated with no changes + force
-        (
-            [test_device],
-            event.EventType.RESOURCE_UPDATED,
-            test_device.id,
-            event.AferoEvent(
-                type=event.EventType.RESOURCE_UPDATED,
-                device_id=test_device.id,
-                device=test_device,
-                force_forward=True,
-            ),
-            {test_device.id},
-            replace(test_res),
+        {test_device.id},
+        None,
+    ),
+    # Device updated with no changes + force
+    (
+        [test_device],
+        event.EventType.RESOURCE_UPDATED,
+        test_device.id,
+        event.AferoEvent(
+            type=event.EventType.RESOURCE_UPDATED,
+            device_id=test_device.id,
+            device=test_device,
+            force_forward=True,
         ),
-        # Device deleted
-        (
-            [test_device],
-            event.EventType.RESOURCE_DELETED,
-            test_device.id,
-            event.AferoEvent(
-                type=event.EventType.RESOURCE_DELETED,
-                device_id=test_device.id,
-                force_forward=False,
-            ),
-            set(),
-            replace(test_res),
+        {test_device.id},
+        test_res,
+    ),
+    # Device deleted
+    (
+        [test_device],
+        event.EventType.RESOURCE_DELETED,
+        test_device.id,
+        event.AferoEvent(
+            type=event.EventType.RESOURCE_DELETED,
+            device_id=test_device.id,
+            force_forward=False,
         ),
-        # Not a real event
-        (
-            [],
-            event.EventType.RECONNECTED,
-            test_device.id,
-            event.AferoEvent(
-                type=event.EventType.RECONNECTED,
-                device_id=test_device.id,
-                force_forward=False,
-            ),
-            set(),
-            None,
+        set(),
+        test_res,
+    ),
+    # Not a real event
+    (
+        [],
+        event.EventType.RECONNECTED,
+        test_device.id,
+        event.AferoEvent(
+            type=event.EventType.RECONNECTED,
+            device_id=test_device.id,
+            force_forward=False,
         ),
-    ],
-)
-async def test__handle_event_type(
-    init_elem, evt_type, item_id, evt_data, expected_devs, expected_return, ex1_rc
-):
-    for elem in init_elem:
-        ex1_rc._items[elem.id] = await ex1_rc.initialize_elem(elem)
-        ex1_rc._bridge.add_device(elem.id, ex1_rc)
-    assert (
-        await ex1_rc._handle_event_type(evt_type, item_id, evt_data) == expected_return
-    )
-    if expected_return and evt_type != event.EventType.RESOURCE_DELETED:
-        assert item_id in ex1_rc
-    assert ex1_rc._bridge.tracked_devices == expected_devs
+        set(),
+        None,
+    ),
+]
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize("is_coroutine", [True, False])
-@pytest.mark.parametrize(
-    "id_filter, event_filter, event_type, expected",
-    [
-        ("beans", event.EventType.RESOURCE_ADDED, event.EventType.RESOURCE_ADDED, True),
-        (
-            "beans",
-            event.EventType.RESOURCE_ADDED,
-            event.EventType.RESOURCE_UPDATED,
-            False,
-        ),
-        (
-            "not-a-bean",
-            event.EventType.RESOURCE_ADDED,
-            event.EventType.RESOURCE_ADDED,
-            False,
-        ),
-    ],
-)
-async def test_emit_to_subscribers(
-    is_coroutine, id_filter, event_filter, event_type, expected, ex1_rc, mocker
-):
+async def test__handle_event_type(ex1_rc):
+    # Cases are cheap so run them within a single test
+    for (
+        init_elem,
+        evt_type,
+        item_id,
+        evt_data,
+        expected_devs,
+        expected_return,
+    ) in HANDLE_EVENT_TYPE_CASES:
+        ex1_rc._items.clear()
+        ex1_rc._bridge._known_devs.clear()
+        for elem in init_elem:
+            ex1_rc._items[elem.id] = await ex1_rc.initialize_elem(elem)
+            ex1_rc._bridge.add_device(elem.id, ex1_rc)
+        assert (
+            await ex1_rc._handle_event_type(evt_type, item_id, evt_data)
+            == expected_return
+        )
+        if expected_return and evt_type != event.EventType.RESOURCE_DELETED:
+            assert item_id in ex1_rc
+        assert ex1_rc._bridge.tracked_devices == expected_devs
+
+
+# id_filter, event_filter, event_type, expected
+EMIT_TO_SUBSCRIBERS_CASES = [
+    ("beans", event.EventType.RESOURCE_ADDED, event.EventType.RESOURCE_ADDED, True),
+    (
+        "beans",
+        event.EventType.RESOURCE_ADDED,
+        event.EventType.RESOURCE_UPDATED,
+        False,
+    ),
+    (
+        "not-a-bean",
+        event.EventType.RESOURCE_ADDED,
+        event.EventType.RESOURCE_ADDED,
+        False,
+    ),
+]
+
+
+@pytest.mark.asyncio
+async def test_emit_to_subscribers(ex1_rc, mocker):
+    # Cases are cheap so run them within a single test
+    for is_coroutine in [True, False]:
+        for id_filter, event_filter, event_type, expected in EMIT_TO_SUBSCRIBERS_CASES:
+            callback = mocker.AsyncMock() if is_coroutine else mocker.Mock()
+            unsub = ex1_rc.subscribe(
+                callback, id_filter=id_filter, event_filter=event_filter
+            )
+            await ex1_rc.emit_to_subscribers(event_type, "beans", test_res)
+            await asyncio.gather(*ex1_rc._background_tasks)
+            unsub()
+            if expected:
+                callback.assert_called_once()
+            else:
+                callback.assert_not_called()
 
-    callback = mocker.AsyncMock() if is_coroutine else mocker.Mock()
-    ex1_rc.subscribe(callback, id_filter=id_filter, event_filter=event_filter)
-    await ex1_rc.emit_to_subscribers(event_type, "beans", test_res)
-    if expected:
-        callback.assert_called_once()
-    else:
-        callback.assert_not_called()
-    pass
 
+@pytest.mark.asyncio
+async def test_emit_to_subscribers_coroutines(ex1_rc, mocker, caplog):
+    good = mocker.AsyncMock()
+    bad = mocker.AsyncMock(side_effect=ValueError("beans"))
+    ex1_rc.subscribe(good)
+    ex1_rc.subscribe(bad, id_filter="beans")
+    create_task = mocker.spy(asyncio, "create_task")
+    await ex1_rc.emit_to_subscribers(
+        event.EventType.RESOURCE_UPDATED, "beans", test_res
+    )
+    create_task.assert_called_once()
+    await asyncio.gather(*ex1_rc._background_tasks)
+    good.assert_awaited_once_with(event.EventType.RESOURCE_UPDATED, test_res)
+    bad.assert_awaited_once_with(event.EventType.RESOURCE_UPDATED, test_res)
+    assert "Unhandled exception from subscriber" in caplog.text
+    assert not ex1_rc._background_tasks
 
+
+@pytest.mark.usefixtures("ex1_rc_with_device")
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "evt_type, evt_data, called",
@@ -391,8 +416,6 @@ async def test_emit_to_subscribers(
     ],
 )
 async def test__handle_event(evt_type, evt_data, called, ex1_rc, mocker):
-    ex1_rc._items[test_device.id] = await ex1_rc.initialize_elem(test_device)
-    ex1_rc._bridge.add_device(test_device.id, ex1_rc)
     emitted = mocker.patch.object(ex1_rc, "emit_to_subscribers")
     await ex1_rc._handle_event(evt_type, evt_data)
     if called:
@@ -401,13 +424,19 @@ async def test__handle_event(evt_type, evt_data, called, ex1_rc, mocker):
         emitted.assert_not_called()
 
 
+# Devices generated by mocked_get_filtered_devices, keyed by their ID
+_filtered_devices: dict[str, AferoDevice] = {}
+
+
 def mocked_get_filtered_devices(initial_data) -> list[AferoDevice]:
     valid = []
     for ind, element in enumerate(initial_data):
         if element["typeId"] != models.ResourceTypes.DEVICE.value:
             continue
         if ind % 2 == 0:
-            valid.append(get_afero_device(element))
+            if element["id"] not in _filtered_devices:
+                _filtered_devices[element["id"]] = get_afero_device(element)
+            valid.append(_filtered_devices[element["id"]])
     return valid
 
 
@@ -433,32 +462,66 @@ def mocked_get_filtered_devices(initial_data) -> list[AferoDevice]:
         ),
     ],
 )
-async def test__get_valid_devices(get_filtered_devices, expected_ids, ex1_rc):
-    data = utils.get_raw_dump("raw_hs_data.json")
+async def test__get_valid_devices(
+    get_filtered_devices, expected_ids, ex1_rc, raw_hs_data
+):
     if get_filtered_devices:
         ex1_rc.get_filtered_devices = get_filtered_devices
-    devices = await ex1_rc._get_valid_devices(data)
+    devices = await ex1_rc._get_valid_devices(raw_hs_data)
     assert len(devices) == len(expected_ids)
     for device in devices:
         assert device.id in expected_ids
 
 
+class Example1FilteringController(Example1ResourceController):
+
+    def get_filtered_devices(self, initial_data: list[dict]) -> list[AferoDevice]:
+        return []
+
+
+@pytest.mark.parametrize(
+    "controller_cls, patched, expected",
+    [
+        (
+            Example1ResourceController,
+            None,
+            {(models.ResourceTypes.DEVICE.value, models.ResourceTypes.LIGHT.value)},
+        ),
+        # Filtering overridden in a subclass
+        (Example1FilteringController, None, set()),
+        # Filtering overridden on the instance
+        (Example1ResourceController, "get_filtered_devices", set()),
+        (Example1ResourceController, "_get_valid_devices", set()),
+    ],
+)
+def test_routing_keys(controller_cls, patched, expected, mocked_bridge_req, mocker):
+    controller = controller_cls(mocked_bridge_req)
+    if patched:
+        mocker.patch.object(controller, patched)
+    assert controller.routing_keys() == expected
+
+
+def test_routing_keys_no_item_types(ex1_rc, mocker):
+    mocker.patch.object(ex1_rc, "_item_values", frozenset())
+    assert ex1_rc.routing_keys() == frozenset()
+
+
 @pytest.mark.asyncio
-async def test_initialize_not_needed(ex1_rc, mocker):
+async def test_initialize_not_needed(ex1_rc, raw_hs_data, mocker):
     check = mocker.patch.object(ex1_rc, "_get_valid_devices")
     ex1_rc._initialized = True
-    await ex1_rc.initialize(utils.get_raw_dump("raw_hs_data.json"))
+    await ex1_rc.initialize(raw_hs_data)
     check.assert_not_called()
 
 
 @pytest.mark.asyncio
 @pytest.mark.parametrize("item_types", [True, False])
-async def test_initialize(item_types, ex1_rc, mocker):
+async def test_initialize(item_types, ex1_rc, raw_hs_data, mocker):
     ex1_rc._initialized = False
     if not item_types:
         ex1_rc.ITEM_TYPES = []
     handle_event = mocker.patch.object(ex1_rc, "_handle_event")
-    await ex1_rc.initialize(utils.get_raw_dump("raw_hs_data.json"))
+    await ex1_rc.initialize(raw_hs_data)
     assert handle_event.call_count == 3
     if item_types:
         assert ex1_rc._bridge.events._subscribers == [(handle_event, None, ("light",))]
@@ -470,19 +533,24 @@ async def test_initialize(item_types, ex1_rc, mocker):
     "id_filter, event_filter, expected, expected_unsub",
     [
         # No ID filter
-        (None, None, {"*": [(min, None)]}, {"*": []}),
+        (None, None, {"*": {0: (min, None, False)}}, {"*": {}}),
         # ID filter
-        ("beans", None, {"*": [], "beans": [(min, None)]}, {"*": [], "beans": []}),
+        (
+            "beans",
+            None,
+            {"*": {}, "beans": {0: (min, None, False)}},
+            {"*": {}, "beans": {}},
+        ),
         # ID filter as a tuple
         (
             ("beans", "double_beans"),
             (event.EventType.RESOURCE_ADDED,),
             {
-                "*": [],
-                "beans": [(min, (event.EventType.RESOURCE_ADDED,))],
-                "double_beans": [(min, (event.EventType.RESOURCE_ADDED,))],
+                "*": {},
+                "beans": {0: (min, (event.EventType.RESOURCE_ADDED,), False)},
+                "double_beans": {0: (min, (event.EventType.RESOURCE_ADDED,), False)},
             },
-            {"*": [], "beans": [], "double_beans": []},
+            {"*": {}, "beans": {}, "double_beans": {}},
         ),
     ],
 )
@@ -497,18 +565,39 @@ def test_subscribe_with_starting(ex1_rc):
     ex1_rc.subscribe(min, id_filter="cool")
     unsub2 = ex1_rc.subscribe(min, id_filter="cool2")
     assert ex1_rc._subscribers == {
-        "*": [],
-        "cool": [(min, None)],
-        "cool2": [(min, None)],
+        "*": {},
+        "cool": {0: (min, None, False)},
+        "cool2": {1: (min, None, False)},
     }
     unsub2()
-    assert ex1_rc._subscribers == {"*": [], "cool": [(min, None)], "cool2": []}
+    assert ex1_rc._subscribers == {
+        "*": {},
+        "cool": {0: (min, None, False)},
+        "cool2": {},
+    }
+    # Unsubscribing multiple times is a no-op
+    unsub2()
+    assert ex1_rc._subscribers["cool2"] == {}
 
 
+@pytest.mark.asyncio
+async def test_unsubscribe_during_emit(ex1_rc, mocker):
+    unsubs = []
+    callback = mocker.Mock(side_effect=lambda *args: unsubs[0]())
+    unsubs.append(ex1_rc.subscribe(callback))
+    callback2 = mocker.Mock()
+    ex1_rc.subscribe(callback2)
+    await ex1_rc.emit_to_subscribers(
+        event.EventType.RESOURCE_UPDATED, "beans", test_res
+    )
+    callback.assert_called_once()
+    callback2.assert_called_once()
+    assert ex1_rc._subscribers["*"] == {1: (callback2, None, False)}
+
+
+@pytest.mark.usefixtures("ex1_rc_with_device")
 @pytest.mark.asyncio
 async def test__process_state_update(ex1_rc):
-    ex1_rc._items[test_res.id] = await ex1_rc.initialize_elem(test_device)
-    ex1_rc._bridge.add_device(test_res.id, ex1_rc)
     await ex1_rc._process_state_update(
         ex1_rc._items[test_res.id],
         test_res.id,
@@ -533,7 +622,25 @@ async def test__process_state_update(ex1_rc):
     assert state_update.value == "off"
 
 
+DEVICE_STATE_URL = v1_const.AFERO_CLIENTS["hubspace"]["DEVICE_STATE"]
+DATA_HOST = v1_const.AFERO_CLIENTS["hubspace"]["DATA_HOST"]
+
+
+@pytest.fixture(scope="module")
+def module_aioresponse():
+    with aioresponses() as m:
+        yield m
+
+
+@pytest.fixture
+def clear_module_aioresponse(module_aioresponse):
+    yield
+    module_aioresponse.clear()
+
+
+@pytest.mark.slow
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("clear_module_aioresponse")
 @pytest.mark.parametrize(
     "response, response_err, states, expected_call, expected, messages",
     [
@@ -562,7 +669,7 @@ async def test__process_state_update(ex1_rc):
                     ],
                 },
                 "headers": {
-                    "host": v1_const.AFERO_CLIENTS["hubspace"]["DATA_HOST"],
+                    "host": DATA_HOST,
                     "content-type": "application/json; charset=utf-8",
                 },
             },
@@ -594,7 +701,7 @@ async def test__process_state_update(ex1_rc):
                     ],
                 },
                 "headers": {
-                    "host": v1_const.AFERO_CLIENTS["hubspace"]["DATA_HOST"],
+                    "host": DATA_HOST,
                     "content-type": "application/json; charset=utf-8",
                 },
             },
@@ -626,7 +733,7 @@ async def test__process_state_update(ex1_rc):
                     ],
                 },
                 "headers": {
-                    "host": v1_const.AFERO_CLIENTS["hubspace"]["DATA_HOST"],
+                    "host": DATA_HOST,
                     "content-type": "application/json; charset=utf-8",
                 },
             },
@@ -643,15 +750,13 @@ async def test_update_afero_api(
     expected,
     messages,
     ex1_rc,
-    mock_aioresponse,
+    module_aioresponse,
     caplog,
 ):
     device_id = "cool"
-    url = v1_const.AFERO_CLIENTS["hubspace"]["DEVICE_STATE"].format(
-        ex1_rc._bridge.account_id, str(device_id)
-    )
+    url = DEVICE_STATE_URL.format(ex1_rc._bridge.account_id, device_id)
     if response:
-        mock_aioresponse.put(url, **response)
+        module_aioresponse.put(url, **response)
     if response_err:
         ex1_rc._bridge.request.side_effect = response_err
     assert await ex1_rc.update_afero_api(device_id, states) == expected
@@ -670,6 +775,7 @@ async def test_update_dev_not_found(ex1_rc, caplog):
     assert "Unable to update device not-a-device as it does not exist" in caplog.text
 
 
+@pytest.mark.usefixtures("ex1_rc_with_device")
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "obj_in, states, expected_states, expected_item, successful",
@@ -732,14 +838,33 @@ async def test_update_dev_not_found(ex1_rc, caplog):
             test_res_update,
             True,
         ),
+        # Manual states with unsuccessful updates
+        (
+            None,
+            [
+                {
+                    "functionClass": "mapped_beans",
+                    "functionInstance": "bean2",
+                    "value": "on",
+                    "lastUpdateTime": 123456,
+                }
+            ],
+            [
+                {
+                    "functionClass": "mapped_beans",
+                    "functionInstance": "bean2",
+                    "value": "on",
+                    "lastUpdateTime": 123456,
+                }
+            ],
+            test_res,
+            False,
+        ),
     ],
 )
 async def test_update(
     obj_in, states, expected_states, expected_item, successful, ex1_rc, mocker
 ):
-    mocker.patch("time.time", return_value=12345)
-    ex1_rc._items[test_res.id] = await ex1_rc.initialize_elem(test_device)
-    ex1_rc._bridge.add_device(test_res.id, ex1_rc)
     update_afero_api = mocker.patch.object(
         ex1_rc, "update_afero_api", return_value=successful
     )
@@ -751,6 +876,154 @@ async def test_update(
     assert ex1_rc._items[test_res.id] == expected_item
 
 
+@pytest.mark.usefixtures("ex1_rc_with_device")
+@pytest.mark.asyncio
+async def test_update_coalesced(ex1_rc, mocker):
+    update_afero_api = mocker.patch.object(
+        ex1_rc, "update_afero_api", return_value=True
+    )
+    await asyncio.gather(
+        ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(
+                on=None, beans=TestFeatureInstance(on=True, func_instance="bean2")
+            ),
+        ),
+        ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(
+                on=None, beans=TestFeatureInstance(on=False, func_instance="bean1")
+            ),
+        ),
+        ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(
+                on=None, beans=TestFeatureInstance(on=False, func_instance="bean2")
+            ),
+        ),
+    )
+    update_afero_api.assert_called_once_with(
+        test_res.id,
+        [
+            {
+                "functionClass": "beans",
+                "functionInstance": "bean1",
+                "value": "off",
+                "lastUpdateTime": 12345,
+            },
+            {
+                "functionClass": "beans",
+                "functionInstance": "bean2",
+                "value": "off",
+                "lastUpdateTime": 12345,
+            },
+        ],
+    )
+    assert ex1_rc._items[test_res.id].beans["bean1"].on is False
+    assert ex1_rc._items[test_res.id].beans["bean2"].on is False
+    assert ex1_rc._pending_updates == {}
+
+
+@pytest.mark.usefixtures("ex1_rc_with_device")
+@pytest.mark.asyncio
+async def test_update_error(ex1_rc, mocker):
+    mocker.patch.object(ex1_rc, "update_afero_api", side_effect=KeyError)
+    with pytest.raises(KeyError):
+        await ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(
+                on=None, beans=TestFeatureInstance(on=True, func_instance="bean2")
+            ),
+        )
+    assert ex1_rc._items[test_res.id] == test_res
+
+
+@pytest.mark.usefixtures("ex1_rc_with_device")
+@pytest.mark.asyncio
+async def test_update_coalesced_toggled_back(ex1_rc, mocker):
+    update_afero_api = mocker.patch.object(
+        ex1_rc, "update_afero_api", return_value=True
+    )
+    await asyncio.gather(
+        ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(on=TestFeatureBool(on=False), beans=None),
+        ),
+        ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(on=TestFeatureBool(on=True), beans=None),
+        ),
+    )
+    update_afero_api.assert_called_once_with(
+        test_res.id,
+        [
+            {
+                "functionClass": "on",
+                "functionInstance": None,
+                "lastUpdateTime": 12345,
+                "value": True,
+            },
+        ],
+    )
+    assert ex1_rc._items[test_res.id] == test_res
+
+
+@pytest.mark.usefixtures("ex1_rc_with_device")
+@pytest.mark.asyncio
+async def test_update_coalesced_cancelled(ex1_rc):
+    update = asyncio.create_task(
+        ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(on=TestFeatureBool(on=False), beans=None),
+        )
+    )
+    await asyncio.sleep(0)
+    for task in ex1_rc._background_tasks:
+        task.cancel()
+    with pytest.raises(DeviceUpdateError):
+        await update
+    assert ex1_rc._items[test_res.id] == test_res
+    assert ex1_rc._pending_updates == {}
+
+
+@pytest.mark.usefixtures("ex1_rc_with_device")
+@pytest.mark.asyncio
+async def test_update_unsuccessful_while_queued(ex1_rc, mocker):
+    release = asyncio.Event()
+
+    async def unsuccessful_update(device_id, states):
+        await release.wait()
+        return False
+
+    update_afero_api = mocker.patch.object(
+        ex1_rc, "update_afero_api", side_effect=unsuccessful_update
+    )
+    first = asyncio.create_task(
+        ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(on=TestFeatureBool(on=False), beans=None),
+        )
+    )
+    while not update_afero_api.called:
+        await asyncio.sleep(0)
+    # Queued while the first update is being sent
+    second = asyncio.create_task(
+        ex1_rc.update(
+            test_res.id,
+            obj_in=TestResourcePut(
+                on=TestFeatureBool(on=True),
+                beans=TestFeatureInstance(on=True, func_instance="bean2"),
+            ),
+        )
+    )
+    await asyncio.sleep(0)
+    assert ex1_rc._items[test_res.id] == test_res_update
+    release.set()
+    await asyncio.gather(first, second)
+    assert update_afero_api.call_count == 2
+    assert ex1_rc._items[test_res.id] == test_res
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize(
     "starting_items,device_id,expected",
@@ -772,10 +1045,11 @@ async def test_get_device(ex1_rc, starting_items, device_id, expected):
     "resource,update,expected",
     [
         # No updates
-        (replace(test_res), TestResourcePut(on=None, beans=None), replace(test_res)),
+        (deepcopy(test_res), TestResourcePut(on=None, beans=None), test_res),
         # Test single + dict updates
         (
-            replace(test_res),
+            # update_dataclass modifies the resource so it cannot be shared
+            deepcopy(test_res),
             TestResourcePut(
                 on=TestFeatureBool(on=False),
                 beans=TestFeatureInstance(on=False, func_instance=None),
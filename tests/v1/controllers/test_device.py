@@ -17,7 +17,7 @@ freezer = utils.create_devices_from_data("freezer.json")[0]
 
 @pytest.fixture
 def mocked_controller(mocked_bridge, mocker):
-    mocker.patch("time.time", return_value=12345)
+    mocker.patch("time.time_ns", return_value=12345 * 1_000_000_000)
     controller = DeviceController(mocked_bridge)
     yield controller
 
@@ -489,6 +489,28 @@ async def test___event_processor(bridge, mocker):
     emit.assert_called_once_with(exp_event["type"], exp_event)
 
 
+@pytest.mark.asyncio
+async def test_wait_idle(bridge, mocker):
+    stream = bridge.events
+    stream._subscribers = []
+    processed = []
+
+    async def callback(event_type, data):
+        await asyncio.sleep(0)
+        processed.append(data["device_id"])
+        if data["device_id"] == "1234":
+            stream.emit(event_type, {**data, "device_id": "5678"})
+
+    stream.subscribe(callback)
+    stream.add_job(
+        event.AferoEvent(type=event.EventType.RESOURCE_DELETED, device_id="1234")
+    )
+    await stream.wait_idle()
+    assert stream._event_queue.qsize() == 0
+    assert processed == ["1234", "5678"]
+    assert not stream._callback_tasks
+
+
 @pytest.mark.asyncio
 @pytest.mark.parametrize("is_coroutine", [True, False])
 @pytest.mark.parametrize(
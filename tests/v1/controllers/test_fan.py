@@ -16,7 +16,7 @@ zandra_fan = utils.create_devices_from_data("fan-ZandraFan.json")[0]
 
 @pytest.fixture
 def mocked_controller(mocked_bridge, mocker):
-    mocker.patch("time.time", return_value=12345)
+    mocker.patch("time.time_ns", return_value=12345 * 1_000_000_000)
     controller = FanController(mocked_bridge)
     yield controller
 
@@ -255,8 +255,7 @@ async def test_update_elem(mocked_controller):
             }
         ),
     ]
-    for state in new_states:
-        utils.modify_state(dev_update, state)
+    utils.modify_states(dev_update, new_states)
     updates = await mocked_controller.update_elem(dev_update)
     dev = mocked_controller.items[0]
     assert dev.preset.enabled is False
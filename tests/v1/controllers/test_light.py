@@ -19,7 +19,7 @@ dimmer_light = utils.create_devices_from_data("dimmer-HPDA1110NWBP.json")[0]
 
 @pytest.fixture
 def mocked_controller(mocked_bridge, mocker):
-    mocker.patch("time.time", return_value=12345)
+    mocker.patch("time.time_ns", return_value=12345 * 1_000_000_000)
     controller = LightController(mocked_bridge)
     yield controller
 
@@ -35,7 +35,7 @@ async def test_initialize_a21(mocked_controller):
     assert dev.color_mode == features.ColorModeFeature(mode="white")
     assert dev.color_temperature == features.ColorTemperatureFeature(
         temperature=4000,
-        supported=[
+        supported=(
             2200,
             2300,
             2400,
@@ -80,12 +80,12 @@ async def test_initialize_a21(mocked_controller):
             6300,
             6400,
             6500,
-        ],
+        ),
         prefix="",
     )
     assert dev.dimming == features.DimmingFeature(
         brightness=50,
-        supported=[
+        supported=(
             1,
             2,
             3,
@@ -186,7 +186,7 @@ async def test_initialize_a21(mocked_controller):
             98,
             99,
             100,
-        ],
+        ),
     )
     assert dev.effect == features.EffectFeature(
         effect="getting-ready",
@@ -223,7 +223,7 @@ async def test_initialize_zandra(mocked_controller):
     assert dev.color is None
     assert dev.color_mode is None
     assert dev.color_temperature == features.ColorTemperatureFeature(
-        temperature=3000, supported=[2700, 3000, 3500, 4000, 5000, 6500], prefix="K"
+        temperature=3000, supported=(2700, 3000, 3500, 4000, 5000, 6500), prefix="K"
     )
 
 
@@ -294,6 +294,40 @@ async def test_turn_off(afero_dev, expected_instance, mocked_controller):
     assert not dev.is_on
 
 
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "in_flight, expected_requests",
+    [
+        # Both commands are sent within the same request
+        (False, [["on"]]),
+        # Second command is issued while the first request is in progress
+        (True, [["off"], ["on"]]),
+    ],
+)
+async def test_turn_off_on_back_to_back(
+    in_flight, expected_requests, mocked_controller, mocker
+):
+    await mocked_controller.initialize_elem(a21_light)
+    dev = mocked_controller.items[0]
+    requests = []
+
+    async def slow_update_afero_api(device_id, states):
+        requests.append([state["value"] for state in states])
+        await asyncio.sleep(0.05)
+        return True
+
+    mocker.patch.object(
+        mocked_controller, "update_afero_api", side_effect=slow_update_afero_api
+    )
+    turn_off = asyncio.create_task(mocked_controller.turn_off(a21_light.id))
+    if in_flight:
+        while not requests:
+            await asyncio.sleep(0)
+    await asyncio.gather(turn_off, mocked_controller.turn_on(a21_light.id))
+    assert requests == expected_requests
+    assert dev.is_on
+
+
 @pytest.mark.asyncio
 async def test_set_color_temperature(mocked_controller):
     await mocked_controller.initialize_elem(a21_light)
@@ -521,8 +555,7 @@ async def test_update_elem(mocked_controller):
             }
         ),
     ]
-    for state in new_states:
-        utils.modify_state(dev_update, state)
+    utils.modify_states(dev_update, new_states)
     updates = await mocked_controller.update_elem(dev_update)
     dev = mocked_controller.items[0]
     assert dev.on.on is True
@@ -600,8 +633,7 @@ async def test_update_elem_effect(new_states, expected, mocked_controller):
     await mocked_controller.initialize_elem(a21_light)
     assert len(mocked_controller.items) == 1
     dev_update = utils.create_devices_from_data("light-a21.json")[0]
-    for state in new_states:
-        utils.modify_state(dev_update, state)
+    utils.modify_states(dev_update, new_states)
     await mocked_controller.update_elem(dev_update)
     dev = mocked_controller.items[0]
     assert dev.effect.effect == expected
@@ -15,7 +15,7 @@ lock = utils.create_devices_from_data("door-lock-TBD.json")[0]
 
 @pytest.fixture
 def mocked_controller(mocked_bridge, mocker):
-    mocker.patch("time.time", return_value=12345)
+    mocker.patch("time.time_ns", return_value=12345 * 1_000_000_000)
     controller = LockController(mocked_bridge)
     yield controller
 
@@ -110,8 +110,7 @@ async def test_update_elem(value, expected, expected_updates, mocked_controller)
         ),
     ]
     expected_updates.add("available")
-    for state in new_states:
-        utils.modify_state(dev_update, state)
+    utils.modify_states(dev_update, new_states)
     updates = await mocked_controller.update_elem(dev_update)
     assert dev.position.position == expected
     assert not dev.available
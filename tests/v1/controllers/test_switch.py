@@ -3,6 +3,7 @@
 import asyncio
 
 import pytest
+import pytest_asyncio
 
 from aioafero.device import AferoState
 from aioafero.v1.controllers import event
@@ -10,208 +11,179 @@ from aioafero.v1.controllers.switch import SwitchController, features
 
 from .. import utils
 
-switch = utils.create_devices_from_data("switch-HPDA311CWB.json")[0]
-transformer = utils.create_devices_from_data("transformer.json")[0]
-glass_door = utils.create_devices_from_data("glass-door.json")[0]
+pytestmark = pytest.mark.usefixtures("frozen_time")
+
+# Expected on features. They are shared between tests so must not be modified
+POWER_OFF = {
+    None: features.OnFeature(on=False, func_class="power", func_instance=None),
+}
+POWER_ON = {
+    None: features.OnFeature(on=True, func_class="power", func_instance=None),
+}
+TRANSFORMER_INITIAL = {
+    None: features.OnFeature(on=False, func_class="power", func_instance=None),
+    "zone-1": features.OnFeature(on=False, func_class="toggle", func_instance="zone-1"),
+    "zone-2": features.OnFeature(on=True, func_class="toggle", func_instance="zone-2"),
+    "zone-3": features.OnFeature(on=False, func_class="toggle", func_instance="zone-3"),
+}
+TRANSFORMER_ZONE_1_ON = {
+    None: features.OnFeature(on=False, func_class="power", func_instance=None),
+    "zone-1": features.OnFeature(on=True, func_class="toggle", func_instance="zone-1"),
+    "zone-2": features.OnFeature(on=True, func_class="toggle", func_instance="zone-2"),
+    "zone-3": features.OnFeature(on=False, func_class="toggle", func_instance="zone-3"),
+}
+TRANSFORMER_ALL_OFF = {
+    None: features.OnFeature(on=False, func_class="power", func_instance=None),
+    "zone-1": features.OnFeature(on=False, func_class="toggle", func_instance="zone-1"),
+    "zone-2": features.OnFeature(on=False, func_class="toggle", func_instance="zone-2"),
+    "zone-3": features.OnFeature(on=False, func_class="toggle", func_instance="zone-3"),
+}
 
 
 @pytest.fixture
-def mocked_controller(mocked_bridge, mocker):
-    mocker.patch("time.time", return_value=12345)
-    controller = SwitchController(mocked_bridge)
-    yield controller
+def switch():
+    return utils.create_devices_from_data("switch-HPDA311CWB.json")[0]
 
 
-@pytest.mark.asyncio
-async def test_initialize(mocked_controller):
-    await mocked_controller.initialize_elem(switch)
-    assert len(mocked_controller.items) == 1
-    dev = mocked_controller.items[0]
-    assert dev.id == "feb5d9db-0562-478b-aaa0-00c889f0a758"
-    assert dev.on == {
-        None: features.OnFeature(on=False, func_class="power", func_instance=None),
-    }
+@pytest.fixture
+def transformer():
+    return utils.create_devices_from_data("transformer.json")[0]
 
 
-@pytest.mark.asyncio
-async def test_initialize_multi(mocked_controller):
-    await mocked_controller.initialize_elem(transformer)
-    assert len(mocked_controller.items) == 1
-    dev = mocked_controller.items[0]
-    assert dev.id == "f9aa07e9-a4ce-46b4-b6bc-ad3bc070bc90"
-    assert dev.on == {
-        None: features.OnFeature(on=False, func_class="power", func_instance=None),
-        "zone-1": features.OnFeature(
-            on=False, func_class="toggle", func_instance="zone-1"
-        ),
-        "zone-2": features.OnFeature(
-            on=True, func_class="toggle", func_instance="zone-2"
-        ),
-        "zone-3": features.OnFeature(
-            on=False, func_class="toggle", func_instance="zone-3"
-        ),
-    }
+@pytest.fixture
+def glass_door():
+    return utils.create_devices_from_data("glass-door.json")[0]
 
 
-@pytest.mark.asyncio
-async def test_initialize_glass_door(mocked_controller):
-    await mocked_controller.initialize_elem(glass_door)
-    assert len(mocked_controller.items) == 1
-    dev = mocked_controller.items[0]
-    assert dev.id == "89d12e53-2c38-46b3-af2a-ced1ccc04c39"
-    assert dev.on == {
-        None: features.OnFeature(on=False, func_class="power", func_instance=None),
-    }
+@pytest.fixture
+def mocked_controller(module_mocked_bridge):
+    utils.reset_mocked_bridge(module_mocked_bridge)
+    yield SwitchController(module_mocked_bridge)
 
 
-@pytest.mark.asyncio
-async def test_turn_on(mocked_controller):
+@pytest_asyncio.fixture
+async def switch_controller(mocked_controller, switch):
+    """mocked_controller that is tracking switch"""
     await mocked_controller.initialize_elem(switch)
-    dev = mocked_controller.items[0]
-    await mocked_controller.turn_on(switch.id)
-    req = utils.get_json_call(mocked_controller)
-    assert req["metadeviceId"] == switch.id
-    expected_states = [
-        {
-            "functionClass": "power",
-            "functionInstance": None,
-            "lastUpdateTime": 12345,
-            "value": "on",
-        }
-    ]
-    utils.ensure_states_sent(mocked_controller, expected_states)
-    assert dev.on == {
-        None: features.OnFeature(on=True, func_class="power", func_instance=None)
-    }
+    mocked_controller._bridge.add_device(switch.id, mocked_controller)
+    yield mocked_controller
 
 
-@pytest.mark.asyncio
-async def test_turn_on_multi(mocked_controller):
+@pytest_asyncio.fixture
+async def transformer_controller(mocked_controller, transformer):
+    """mocked_controller that is tracking transformer"""
     await mocked_controller.initialize_elem(transformer)
-    dev = mocked_controller.items[0]
-    await mocked_controller.turn_on(transformer.id, instance="zone-1")
-    req = utils.get_json_call(mocked_controller)
-    assert req["metadeviceId"] == transformer.id
-    expected_states = [
-        {
-            "functionClass": "toggle",
-            "functionInstance": "zone-1",
-            "lastUpdateTime": 12345,
-            "value": "on",
-        }
-    ]
-    utils.ensure_states_sent(mocked_controller, expected_states)
-    assert dev.on == {
-        None: features.OnFeature(on=False, func_class="power", func_instance=None),
-        "zone-1": features.OnFeature(
-            on=True, func_class="toggle", func_instance="zone-1"
-        ),
-        "zone-2": features.OnFeature(
-            on=True, func_class="toggle", func_instance="zone-2"
-        ),
-        "zone-3": features.OnFeature(
-            on=False, func_class="toggle", func_instance="zone-3"
-        ),
-    }
-
-
-@pytest.mark.asyncio
-async def test_turn_on_glass_door(mocked_controller):
-    await mocked_controller.initialize_elem(glass_door)
-    dev = mocked_controller.items[0]
-    await mocked_controller.turn_on(glass_door.id)
-    req = utils.get_json_call(mocked_controller)
-    assert req["metadeviceId"] == glass_door.id
-    expected_states = [
-        {
-            "functionClass": "power",
-            "functionInstance": None,
-            "lastUpdateTime": 12345,
-            "value": "on",
-        }
-    ]
-    utils.ensure_states_sent(mocked_controller, expected_states)
-    assert dev.on == {
-        None: features.OnFeature(on=True, func_class="power", func_instance=None)
-    }
+    mocked_controller._bridge.add_device(transformer.id, mocked_controller)
+    yield mocked_controller
 
 
 @pytest.mark.asyncio
-async def test_turn_off(mocked_controller):
-    await mocked_controller.initialize_elem(switch)
+@pytest.mark.parametrize(
+    "file_name, expected_id, expected_on",
+    [
+        # Single toggle
+        (
+            "switch-HPDA311CWB.json",
+            "feb5d9db-0562-478b-aaa0-00c889f0a758",
+            POWER_OFF,
+        ),
+        # Multiple toggles
+        (
+            "transformer.json",
+            "f9aa07e9-a4ce-46b4-b6bc-ad3bc070bc90",
+            TRANSFORMER_INITIAL,
+        ),
+        # Glass door
+        (
+            "glass-door.json",
+            "89d12e53-2c38-46b3-af2a-ced1ccc04c39",
+            POWER_OFF,
+        ),
+    ],
+)
+async def test_initialize(file_name, expected_id, expected_on, mocked_controller):
+    device = utils.create_devices_from_data(file_name)[0]
+    await mocked_controller.initialize_elem(device)
+    assert len(mocked_controller.items) == 1
     dev = mocked_controller.items[0]
-    await mocked_controller.turn_off(switch.id)
-    req = utils.get_json_call(mocked_controller)
-    assert req["metadeviceId"] == switch.id
-    expected_states = [
-        {
-            "functionClass": "power",
-            "functionInstance": None,
-            "lastUpdateTime": 12345,
-            "value": "off",
-        }
-    ]
-    utils.ensure_states_sent(mocked_controller, expected_states)
-    assert dev.on == {
-        None: features.OnFeature(on=False, func_class="power", func_instance=None)
-    }
+    assert dev.id == expected_id
+    assert dev.on == expected_on
 
 
 @pytest.mark.asyncio
-async def test_turn_off_multi(mocked_controller):
-    await mocked_controller.initialize_elem(transformer)
-    dev = mocked_controller.items[0]
-    await mocked_controller.turn_off(transformer.id, instance="zone-2")
-    req = utils.get_json_call(mocked_controller)
-    assert req["metadeviceId"] == transformer.id
-    expected_states = [
-        {
-            "functionClass": "toggle",
-            "functionInstance": "zone-2",
-            "lastUpdateTime": 12345,
-            "value": "off",
-        }
-    ]
-    utils.ensure_states_sent(mocked_controller, expected_states)
-    assert dev.on == {
-        None: features.OnFeature(on=False, func_class="power", func_instance=None),
-        "zone-1": features.OnFeature(
-            on=False, func_class="toggle", func_instance="zone-1"
+@pytest.mark.parametrize(
+    "file_name, action, instance, expected_state, expected_on",
+    [
+        # Single toggle
+        (
+            "switch-HPDA311CWB.json",
+            "turn_on",
+            None,
+            {"functionClass": "power", "functionInstance": None, "value": "on"},
+            POWER_ON,
         ),
-        "zone-2": features.OnFeature(
-            on=False, func_class="toggle", func_instance="zone-2"
+        (
+            "switch-HPDA311CWB.json",
+            "turn_off",
+            None,
+            {"functionClass": "power", "functionInstance": None, "value": "off"},
+            POWER_OFF,
         ),
-        "zone-3": features.OnFeature(
-            on=False, func_class="toggle", func_instance="zone-3"
+        # Multiple toggles
+        (
+            "transformer.json",
+            "turn_on",
+            "zone-1",
+            {"functionClass": "toggle", "functionInstance": "zone-1", "value": "on"},
+            TRANSFORMER_ZONE_1_ON,
         ),
-    }
-
-
-@pytest.mark.asyncio
-async def test_turn_off_glass_door(mocked_controller):
-    await mocked_controller.initialize_elem(glass_door)
+        (
+            "transformer.json",
+            "turn_off",
+            "zone-2",
+            {"functionClass": "toggle", "functionInstance": "zone-2", "value": "off"},
+            TRANSFORMER_ALL_OFF,
+        ),
+        # Glass door
+        (
+            "glass-door.json",
+            "turn_on",
+            None,
+            {"functionClass": "power", "functionInstance": None, "value": "on"},
+            POWER_ON,
+        ),
+        (
+            "glass-door.json",
+            "turn_off",
+            None,
+            {"functionClass": "power", "functionInstance": None, "value": "off"},
+            POWER_OFF,
+        ),
+    ],
+)
+async def test_turn_on_off(
+    file_name,
+    action,
+    instance,
+    expected_state,
+    expected_on,
+    mocked_controller,
+):
+    device = utils.create_devices_from_data(file_name)[0]
+    await mocked_controller.initialize_elem(device)
     dev = mocked_controller.items[0]
-    await mocked_controller.turn_off(glass_door.id)
+    await getattr(mocked_controller, action)(device.id, instance=instance)
     req = utils.get_json_call(mocked_controller)
-    assert req["metadeviceId"] == glass_door.id
-    expected_states = [
-        {
-            "functionClass": "power",
-            "functionInstance": None,
-            "lastUpdateTime": 12345,
-            "value": "off",
-        }
-    ]
-    utils.ensure_states_sent(mocked_controller, expected_states)
-    assert dev.on == {
-        None: features.OnFeature(on=False, func_class="power", func_instance=None)
-    }
+    assert req["metadeviceId"] == device.id
+    utils.ensure_states_sent(
+        mocked_controller, [{**expected_state, "lastUpdateTime": 12345}]
+    )
+    assert dev.on == expected_on
 
 
 @pytest.mark.asyncio
-async def test_update_elem(mocked_controller):
-    await mocked_controller.initialize_elem(transformer)
-    assert len(mocked_controller.items) == 1
+async def test_update_elem(transformer_controller):
+    assert len(transformer_controller.items) == 1
     dev_update = utils.create_devices_from_data("transformer.json")[0]
     new_states = [
         AferoState(
@@ -239,10 +211,9 @@ async def test_update_elem(mocked_controller):
             }
         ),
     ]
-    for state in new_states:
-        utils.modify_state(dev_update, state)
-    updates = await mocked_controller.update_elem(dev_update)
-    dev = mocked_controller.items[0]
+    utils.modify_states(dev_update, new_states)
+    updates = await transformer_controller.update_elem(dev_update)
+    dev = transformer_controller.items[0]
     assert dev.on["zone-1"].on is True
     assert dev.on["zone-2"].on is False
     assert updates == {"on", "available"}
@@ -250,16 +221,14 @@ async def test_update_elem(mocked_controller):
 
 
 @pytest.mark.asyncio
-async def test_empty_update(mocked_controller):
-    switch = utils.create_devices_from_data("switch-HPDA311CWB.json")[0]
-    await mocked_controller.initialize_elem(switch)
-    assert len(mocked_controller.items) == 1
-    updates = await mocked_controller.update_elem(switch)
+async def test_empty_update(switch_controller, switch):
+    assert len(switch_controller.items) == 1
+    updates = await switch_controller.update_elem(switch)
     assert updates == set()
 
 
 @pytest.mark.asyncio
-async def test_switch_emit_update(bridge):
+async def test_switch_emit_update(bridge, transformer):
     add_event = {
         "type": "add",
         "device_id": transformer.id,
@@ -267,8 +236,7 @@ async def test_switch_emit_update(bridge):
     }
     # Simulate a poll
     bridge.events.emit(event.EventType.RESOURCE_ADDED, add_event)
-    # Bad way to check, but just wait a second so it can get processed
-    await asyncio.sleep(1)
+    await bridge.events.wait_idle()
     assert len(bridge.switches._items) == 1
     # Simulate an update
     transformer_update = utils.create_devices_from_data("transformer.json")[0]
@@ -286,35 +254,82 @@ async def test_switch_emit_update(bridge):
         "device": transformer_update,
     }
     bridge.events.emit(event.EventType.RESOURCE_UPDATED, update_event)
-    # Bad way to check, but just wait a second so it can get processed
-    await asyncio.sleep(1)
+    await bridge.events.wait_idle()
     assert len(bridge.switches._items) == 1
     assert not bridge.switches._items[transformer.id].on["zone-2"].on
 
 
 @pytest.mark.asyncio
-async def test_set_state_empty(mocked_controller):
-    await mocked_controller.initialize_elem(switch)
-    await mocked_controller.set_state(switch.id)
+async def test_set_state_empty(switch_controller, switch, caplog):
+    caplog.set_level(0)
+    await switch_controller.set_state(switch.id)
+    switch_controller._bridge.request.assert_not_called()
+    assert "No states to send. Skipping" in caplog.text
 
 
 @pytest.mark.asyncio
-async def test_set_state_no_dev(mocked_controller, caplog):
+async def test_set_state_no_dev(transformer_controller, caplog):
     caplog.set_level(0)
-    await mocked_controller.initialize_elem(transformer)
-    mocked_controller._bridge.add_device(transformer.id, mocked_controller)
-    await mocked_controller.set_state("not-a-device")
-    mocked_controller._bridge.request.assert_not_called()
+    await transformer_controller.set_state("not-a-device")
+    transformer_controller._bridge.request.assert_not_called()
     assert "Unable to find device" in caplog.text
 
 
 @pytest.mark.asyncio
-async def test_set_state_invalid_instance(mocked_controller, caplog):
+async def test_set_state_invalid_instance(transformer_controller, transformer, caplog):
     caplog.set_level(0)
-    await mocked_controller.initialize_elem(transformer)
-    mocked_controller._bridge.add_device(transformer.id, mocked_controller)
-    await mocked_controller.set_state(
+    await transformer_controller.set_state(
         transformer.id, on=True, instance="not-a-instance"
     )
-    mocked_controller._bridge.request.assert_not_called()
-    assert "No states to send. Skipping" in caplog.text
+    transformer_controller._bridge.request.assert_not_called()
+    assert "Unable to find instance not-a-instance" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_update_unsuccessful_while_queued(
+    transformer_controller, transformer, mocker
+):
+    release = asyncio.Event()
+
+    async def update_afero_api(device_id, states):
+        await release.wait()
+        # Only the update for zone-1 is rejected
+        return states[0]["functionInstance"] != "zone-1"
+
+    update_afero_api_mock = mocker.patch.object(
+        transformer_controller, "update_afero_api", side_effect=update_afero_api
+    )
+    zone_1 = asyncio.create_task(
+        transformer_controller.turn_on(transformer.id, instance="zone-1")
+    )
+    while not update_afero_api_mock.called:
+        await asyncio.sleep(0)
+    # Queued while the update for zone-1 is being sent
+    zone_3 = asyncio.create_task(
+        transformer_controller.turn_on(transformer.id, instance="zone-3")
+    )
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(zone_1, zone_3)
+    assert update_afero_api_mock.call_count == 2
+    dev = transformer_controller[transformer.id]
+    assert not dev.on["zone-1"].on
+    assert dev.on["zone-3"].on
+
+
+@pytest.mark.asyncio
+async def test_update_states_unsuccessful(transformer_controller, transformer, mocker):
+    mocker.patch.object(transformer_controller, "update_afero_api", return_value=False)
+    # update_elem modifies the features in-place
+    await transformer_controller.update(
+        transformer.id,
+        states=[
+            {
+                "functionClass": "toggle",
+                "functionInstance": "zone-1",
+                "value": "on",
+                "lastUpdateTime": 12345,
+            }
+        ],
+    )
+    assert transformer_controller[transformer.id].on == TRANSFORMER_INITIAL
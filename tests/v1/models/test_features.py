@@ -1,3 +1,5 @@
+import pytest
+
 from aioafero.v1.models import features
 
 
@@ -17,11 +19,22 @@ def test_ColorFeature():
             }
         }
     }
+    assert feat.api_value is feat.api_value
+    feat.red = 40
+    assert feat.api_value == {
+        "value": {
+            "color-rgb": {
+                "r": 40,
+                "g": 20,
+                "b": 30,
+            }
+        }
+    }
 
 
 def test_ColorTemperatureFeature():
     feat = features.ColorTemperatureFeature(
-        temperature=3000, supported=[1000, 2000, 3000], prefix="K"
+        temperature=3000, supported=(1000, 2000, 3000), prefix="K"
     )
     assert feat.api_value == "3000K"
 
@@ -33,6 +46,12 @@ def test_CurrentPositionEnum():
     assert feat.value == features.CurrentPositionEnum.UNKNOWN.value
 
 
+def test_to_position():
+    assert features.to_position("locking") is features.CurrentPositionEnum.LOCKING
+    assert features.to_position("no") is features.CurrentPositionEnum.UNKNOWN
+    assert features.to_position("locked") == "locked"
+
+
 def test_CurrentPositionFeature():
     feat = features.CurrentPositionFeature(features.CurrentPositionEnum.LOCKED)
     assert feat.api_value == "locked"
@@ -40,7 +59,7 @@ def test_CurrentPositionFeature():
 
 def test_DimmingFeature():
     feat = features.DimmingFeature(
-        brightness=30, supported=[10, 20, 30, 40, 50, 60, 70, 80, 90, 100]
+        brightness=30, supported=(10, 20, 30, 40, 50, 60, 70, 80, 90, 100)
     )
     assert feat.api_value == 30
 
@@ -80,6 +99,22 @@ def test_EffectFeature():
     assert not feat.is_preset("rainbow")
     feat = features.EffectFeature(effect="fade-3", effects={"custom": {"rainbow"}})
     assert not feat.is_preset("rainbow")
+    # First group containing the effect is used
+    feat = features.EffectFeature(
+        effect="rainbow", effects={"custom": {"rainbow"}, "other": {"rainbow"}}
+    )
+    assert feat.api_value == [
+        {
+            "functionClass": "color-sequence",
+            "functionInstance": "preset",
+            "value": "custom",
+        },
+        {
+            "functionClass": "color-sequence",
+            "functionInstance": "custom",
+            "value": "rainbow",
+        },
+    ]
 
 
 def test_ModeFeature():
@@ -96,6 +131,12 @@ def test_OnFeature():
         "functionClass": "cool",
         "functionInstance": "beans",
     }
+    feat.on = True
+    assert feat.api_value == {
+        "value": "on",
+        "functionClass": "cool",
+        "functionInstance": "beans",
+    }
 
 
 def test_OpenFeature():
@@ -107,6 +148,12 @@ def test_OpenFeature():
         "functionClass": "cool",
         "functionInstance": "beans",
     }
+    feat.open = True
+    assert feat.api_value == {
+        "value": "on",
+        "functionClass": "cool",
+        "functionInstance": "beans",
+    }
 
 
 def test_PresetFeature():
@@ -140,3 +187,17 @@ def test_SpeedFeature():
     assert feat.api_value == "speed-4-25"
     feat.speed = 50
     assert feat.api_value == "speed-4-50"
+
+
+@pytest.mark.parametrize(
+    "feat",
+    [
+        features.ColorModeFeature("white"),
+        features.OnFeature(on=True),
+        features.SpeedFeature(speed=25, speeds=["speed-4-25"]),
+    ],
+)
+def test_features_slotted(feat):
+    assert not hasattr(feat, "__dict__")
+    with pytest.raises(AttributeError):
+        feat.not_a_field = True
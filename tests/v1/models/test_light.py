@@ -21,10 +21,10 @@ def populated_light():
         color=features.ColorFeature(red=10, green=20, blue=40),
         color_mode=features.ColorModeFeature(mode="white"),
         color_temperature=features.ColorTemperatureFeature(
-            temperature=3000, supported=list(range(2700, 5000, 100)), prefix="K"
+            temperature=3000, supported=tuple(range(2700, 5000, 100)), prefix="K"
         ),
         dimming=features.DimmingFeature(
-            brightness=100, supported=list(range(0, 101, 10))
+            brightness=100, supported=tuple(range(0, 101, 10))
         ),
         effect=features.EffectFeature(
             effect="rainbow", effects={"custom": {"rainbow"}}
@@ -19,6 +19,7 @@ def test_init_sensor_error():
         _value="alerting",
         unit="beans",
     )
+    assert isinstance(dev, AferoSensor)
     assert dev.value is True
     dev.value = "normal"
     assert dev.value is False
@@ -1,7 +1,10 @@
+import aiohttp
 import pytest
 
 from aioafero import EventType, InvalidAuth
-from aioafero.errors import DeviceNotFound
+from aioafero.errors import DeviceNotFound, ExceededMaximumRetries
+from aioafero.util import json_loads
+from aioafero.v1 import AferoBridgeV1
 from aioafero.v1.controllers.device import DeviceController
 from aioafero.v1.controllers.event import EventStream
 from aioafero.v1.controllers.fan import FanController
@@ -137,6 +140,7 @@ async def test_fetch_data(expected_val, error, mocked_bridge_req, mocker):
     else:
         with pytest.raises(ValueError):
             await mocked_bridge_req.fetch_data()
+    expected.json.assert_called_once_with(loads=json_loads)
 
 
 @pytest.mark.asyncio
@@ -159,11 +163,95 @@ async def test_send_service_request(mocked_bridge):
 
 
 @pytest.mark.asyncio
-async def test_create_request_err(mocked_bridge, mocker):
-    mocker.patch.object(mocked_bridge._auth, "token", side_effect=InvalidAuth)
-    emit = mocker.patch.object(mocked_bridge.events, "emit")
+async def test_request_auth_err(mocked_bridge_req, mocker):
+    mocker.patch.object(mocked_bridge_req._auth, "token", side_effect=InvalidAuth)
+    emit = mocker.patch.object(mocked_bridge_req.events, "emit")
     with pytest.raises(InvalidAuth):
-        async with mocked_bridge.create_request("get", "https://not-called.io"):
-            pass
+        await mocked_bridge_req.request("get", "https://not-called.io")
 
     emit.assert_called_once_with(EventType.INVALID_AUTH)
+
+
+@pytest.mark.asyncio
+async def test_request_reads_body(mocked_bridge_req, mock_aioresponse, mocker):
+    url = "https://not-called.io"
+    mock_aioresponse.put(url, status=200, payload={"beans": "cool"})
+    read = mocker.spy(aiohttp.ClientResponse, "read")
+    res = await mocked_bridge_req.request("put", url)
+    assert res.status == 200
+    read.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_request_backoff(mocked_bridge_req, mock_aioresponse, mocker):
+    url = "https://not-called.io"
+    mock_aioresponse.get(url, status=429, repeat=True)
+    uniform = mocker.patch("random.uniform", return_value=0)
+    with pytest.raises(ExceededMaximumRetries):
+        await mocked_bridge_req.request("get", url)
+    assert uniform.call_args_list == [mocker.call(0, 0.5), mocker.call(0, 1.0)]
+
+
+def test_get_headers(mocked_bridge):
+    assert mocked_bridge.get_headers(authorization="Bearer beans") == {
+        "user-agent": "Dart/2.15 (dart:io)",
+        "accept-encoding": "gzip",
+        "authorization": "Bearer beans",
+    }
+    # Ensure the defaults are not modified
+    assert "authorization" not in mocked_bridge.get_headers()
+
+
+@pytest.mark.asyncio
+async def test_initialize_creates_session(mocker):
+    bridge = AferoBridgeV1("username2", "password2")
+    mocker.patch.object(bridge, "get_account_id")
+    mocker.patch.object(bridge, "fetch_data", return_value=[])
+    mocker.patch.object(bridge.events, "initialize")
+    assert bridge._web_session is None
+    await bridge.initialize()
+    session = bridge._web_session
+    assert session is not None
+    assert session.connector.limit_per_host == 10
+    assert session.timeout.connect == 10
+    await bridge.close()
+    assert session.closed
+
+
+def test__partition_devices(mocked_bridge):
+    data = utils.get_raw_dump("raw_hs_data.json")
+    buckets = mocked_bridge._partition_devices(data, mocked_bridge._controllers)
+    # DeviceController requires all data to determine parents
+    assert mocked_bridge.devices not in buckets
+    for controller in mocked_bridge._controllers[1:]:
+        assert [dev.id for dev in buckets[controller]] == [
+            dev.id for dev in controller.get_filtered_devices(data)
+        ]
+
+
+def test__partition_devices_custom_filtering(mocked_bridge, mocker):
+    data = utils.get_raw_dump("raw_hs_data.json")
+    mocker.patch.object(mocked_bridge.lights, "get_filtered_devices", return_value=[])
+    buckets = mocked_bridge._partition_devices(data, mocked_bridge._controllers)
+    # Controllers that filter devices themselves initialize from all data
+    assert mocked_bridge.lights not in buckets
+    assert mocked_bridge.fans in buckets
+
+
+@pytest.mark.asyncio
+async def test_initialize_partitions_devices(mocker):
+    bridge = AferoBridgeV1("username2", "password2")
+    data = utils.get_raw_dump("raw_hs_data.json")
+    mocker.patch.object(bridge, "get_account_id")
+    mocker.patch.object(bridge, "fetch_data", return_value=data)
+    mocker.patch.object(bridge.events, "initialize")
+    await bridge.initialize()
+    assert all(controller.initialized for controller in bridge._controllers)
+    assert len(bridge.devices.items) == len(bridge.devices.get_filtered_devices(data))
+    assert {light.id for light in bridge.lights} == {
+        "99a03fb7-ebaa-4fc2-a7b5-df223003b127",
+        "84338ebe-7ddf-4bfa-9753-3ee8cdcc8da6",
+        "bc429efe-592a-4852-a18b-5b2a5e6ca5f1",
+    }
+    assert [fan.id for fan in bridge.fans] == ["b50d9823-7ba0-44d9-b9a9-ad64dbbb225f"]
+    await bridge.close()
@@ -1,8 +1,12 @@
-import json
+import asyncio
+import copy
 import os
+from functools import lru_cache
 from typing import Any
 
 from aioafero.device import AferoDevice, AferoState
+from aioafero.util import json_loads
+from aioafero.v1 import AferoBridgeV1
 
 current_path: str = os.path.dirname(os.path.realpath(__file__))
 
@@ -12,8 +16,8 @@ def get_device_dump(file_name: str) -> Any:
 
     :param file_name: Name of the file to load
     """
-    with open(os.path.join(current_path, "device_dumps", file_name), "r") as fh:
-        return json.load(fh)
+    with open(os.path.join(current_path, "device_dumps", file_name), "rb") as fh:
+        return json_loads(fh.read())
 
 
 def get_raw_dump(file_name: str) -> Any:
@@ -21,8 +25,8 @@ def get_raw_dump(file_name: str) -> Any:
 
     :param file_name: Name of the file to load
     """
-    with open(os.path.join(current_path, "data", file_name), "r") as fh:
-        return json.load(fh)
+    with open(os.path.join(current_path, "data", file_name), "rb") as fh:
+        return json_loads(fh.read())
 
 
 def create_devices_from_data(file_name: str) -> list[AferoDevice]:
@@ -30,11 +34,26 @@ def create_devices_from_data(file_name: str) -> list[AferoDevice]:
 
     :param file_name: Name of the file to load
     """
-    devices = get_device_dump(file_name)
-    processed = []
-    for device in devices:
-        processed.append(create_device_from_data(device))
-    return processed
+    return create_devices_from_dump(_get_cached_device_dump(file_name))
+
+
+@lru_cache(maxsize=None)
+def _get_cached_device_dump(file_name: str) -> Any:
+    """Get a device dump that is only parsed once
+
+    The dump is shared between callers so it must not be modified.
+
+    :param file_name: Name of the file to load
+    """
+    return get_device_dump(file_name)
+
+
+def create_devices_from_dump(devices: list[dict]) -> list[AferoDevice]:
+    """Generate devices from an already parsed device dump
+
+    :param devices: Parsed device dump. It is copied so it can be reused
+    """
+    return [create_device_from_data(device) for device in copy.deepcopy(devices)]
 
 
 def create_device_from_data(device: dict) -> AferoDevice:
@@ -47,6 +66,17 @@ def create_device_from_data(device: dict) -> AferoDevice:
     return AferoDevice(**device)
 
 
+def reset_mocked_bridge(bridge: AferoBridgeV1) -> None:
+    """Reset the state tests are able to modify on a shared bridge
+
+    :param bridge: Bridge created by create_mocked_bridge
+    """
+    bridge.request.reset_mock()
+    bridge._known_devs.clear()
+    bridge.events._subscribers.clear()
+    bridge.events._event_queue = asyncio.Queue()
+
+
 def get_json_call(mocked_controller):
     mocked_controller._bridge.request.assert_called_once()
     call = mocked_controller._bridge.request.call_args_list[0][1]
@@ -78,3 +108,26 @@ def modify_state(device: AferoDevice, new_state):
             continue
         device.states[ind] = new_state
         break
+
+
+def modify_states(device: AferoDevice, new_states: list[AferoState]):
+    """Replace multiple states on a device
+
+    States are matched the same way as modify_state, but the states of the
+    device are only indexed once.
+
+    :param device: Device to modify
+    :param new_states: States to place on the device
+    """
+    by_class: dict[str, list[int]] = {}
+    for ind, state in enumerate(device.states):
+        by_class.setdefault(state.functionClass, []).append(ind)
+    for new_state in new_states:
+        for ind in by_class.get(new_state.functionClass, []):
+            if (
+                new_state.functionInstance
+                and new_state.functionInstance != device.states[ind].functionInstance
+            ):
+                continue
+            device.states[ind] = new_state
+            break